@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Batch Portfolio Generator
+Generate portfolios for a whole team from one manifest, sharing README and
+summary caches between users and keeping each GitHub token within its rate limit.
+
+Manifest format (JSON):
+
+    {
+      "defaults": {"no_llm": false, "filters": {"skip_forks": true}},
+      "users": [
+        {"name": "Ada Lovelace", "token": "env:ADA_GITHUB_TOKEN", "output": "portfolios/ada.pdf"},
+        {"name": "Grace Hopper", "username": "grace", "filters": {"min_stars": 1}, "formats": "pdf,html"}
+      ]
+    }
+
+Each user needs either a `token` (lists everything that token can see) or a
+`username` (lists that user's public repositories with GITHUB_TOKEN).
+Tokens may be given literally or as "env:VAR_NAME". `formats` selects the
+outputs (pdf, html, md, json or all); each is written next to `output`.
+"""
+
+import os
+import re
+import sys
+import time
+import json
+import hashlib
+import argparse
+import threading
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from dotenv import load_dotenv
+
+from main import get_user_repos, fetch_readme, prefetch_readmes
+from concurrency import AdaptiveLimiter, DEFAULT_MAX_CONCURRENCY, positive_int, map_ahead
+from filters import build_filters, listing_query_params, filter_repos, DEFAULT_FILTERS
+from process import summarize_project_sections, describe_llm_usage
+from theme import load_theme
+from stats import RepoStats
+from outputs import write_outputs, parse_formats
+from metrics import metrics
+
+# Load environment variables from .env.local file
+load_dotenv('.env.local')
+
+DEFAULT_OUTPUT_DIR = 'portfolios'
+
+
+class SharedCache:
+    """Thread-safe cache that computes each key once, even under concurrent requests"""
+
+    def __init__(self):
+        self._values = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute, should_cache=lambda value: True):
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                metrics.incr('cache_hits')
+                return self._values[key]
+            event = self._inflight.get(key)
+            if event is None:
+                event = self._inflight[key] = threading.Event()
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.hits += 1
+                metrics.incr('cache_hits')
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            # The owner's result was not cacheable (e.g. an error); compute our own
+            return compute()
+
+        try:
+            value = compute()
+            if should_cache(value):
+                with self._lock:
+                    self._values[key] = value
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+
+class TokenBudget:
+    """Per-token request budget: caps concurrent requests and pauses when the rate limit runs low"""
+
+    def __init__(self, concurrency=4, reserve=50):
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.reserve = reserve
+        self.remaining = None
+        self.reset_at = None
+        self.requests = 0
+
+    def observe(self, response):
+        """Update the budget from GitHub's X-RateLimit-* response headers"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        with self._lock:
+            self.requests += 1
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = int(reset)
+
+    def _wait_for_budget(self):
+        with self._lock:
+            low = self.remaining is not None and self.remaining <= self.reserve
+            wait = (self.reset_at - time.time()) if (low and self.reset_at) else 0
+        if wait > 0:
+            print(f"⏳ Rate limit budget low ({self.remaining} left); waiting {int(wait)}s for reset")
+            time.sleep(wait + 1)
+            with self._lock:
+                self.remaining = None
+
+    def __enter__(self):
+        self._wait_for_budget()
+        self._slots.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+
+class BudgetedSession(requests.Session):
+    """Pooled session whose requests are metered by a shared TokenBudget"""
+
+    def __init__(self, budget):
+        super().__init__()
+        self.budget = budget
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=32)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        with self.budget:
+            response = super().request(method, url, *args, **kwargs)
+        self.budget.observe(response)
+        return response
+
+
+def resolve_token(value):
+    """Resolve a manifest token, supporting "env:VAR_NAME" indirection"""
+    if value and value.startswith('env:'):
+        return os.getenv(value[4:])
+    return value
+
+
+def slugify(name):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')
+    return slug or 'portfolio'
+
+
+def load_manifest(path, output_dir=DEFAULT_OUTPUT_DIR):
+    """Load and validate a batch manifest, applying defaults to every entry"""
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    defaults = manifest.get('defaults', {})
+    entries = []
+    for i, raw in enumerate(manifest.get('users', []), 1):
+        entry = dict(defaults)
+        entry.update(raw)
+        entry['filters'] = dict(defaults.get('filters', {}), **raw.get('filters', {}))
+
+        if not entry.get('name'):
+            raise ValueError(f"Manifest entry {i} is missing 'name'")
+        if not entry.get('token') and not entry.get('username'):
+            raise ValueError(f"Manifest entry {i} ({entry['name']}) needs a 'token' or 'username'")
+        unknown = set(entry['filters']) - set(DEFAULT_FILTERS)
+        if unknown:
+            raise ValueError(f"Manifest entry {i} ({entry['name']}) has unknown filter(s): {', '.join(sorted(unknown))}")
+
+        entry['token'] = resolve_token(entry.get('token')) or os.getenv('GITHUB_TOKEN')
+        if not entry['token']:
+            raise ValueError(f"Manifest entry {i} ({entry['name']}) has no usable token and GITHUB_TOKEN is not set")
+        entry.setdefault('output', os.path.join(output_dir, f"{slugify(entry['name'])}.pdf"))
+        formats = entry.get('formats', 'pdf')
+        entry['formats'] = parse_formats(formats if isinstance(formats, str) else ','.join(formats))
+        entries.append(entry)
+
+    outputs = [entry['output'] for entry in entries]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Manifest entries must write to distinct output files")
+    return entries
+
+
+def interleave_by_token(entries):
+    """Order entries round-robin across tokens so no single token's budget is hit by every worker at once"""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry['token'], []).append(entry)
+    ordered = []
+    for batch in zip_longest(*groups.values()):
+        ordered.extend(entry for entry in batch if entry is not None)
+    return ordered
+
+
+def generate_portfolio_for(entry, session, readme_cache, summary_cache, lookahead=4, limiter=None):
+    """Run the full fetch-summarise-render pipeline for one manifest entry.
+    With a shared AdaptiveLimiter, summaries run concurrently within its adaptive limit.
+    """
+    name = entry['name']
+    token = entry['token']
+    no_llm = bool(entry.get('no_llm', False))
+    tag = f"[{name}]"
+
+    filters = build_filters(config=entry['filters'])
+    repos = get_user_repos(listing_query_params(filters), token=token,
+                           username=entry.get('username'), session=session, compact=True)
+    repos, _ = filter_repos(repos, filters)
+    print(f"{tag} 📁 {len(repos)} repositories after filters")
+
+    def load_readme(repo):
+        owner = repo.get('owner', {}).get('login')
+        return readme_cache.get_or_compute(
+            (owner, repo['name']),
+            lambda: fetch_readme(repo['name'], username=owner, token=token, session=session),
+            should_cache=lambda readme: not readme.startswith("Error fetching README"),
+        )
+
+    def summarise(item):
+        _, readme = item
+        if readme == "No README found" or readme.startswith("Error fetching README"):
+            return None
+        key = (hashlib.sha256(readme.encode('utf-8')).hexdigest(), no_llm)
+        return summary_cache.get_or_compute(
+            key,
+            lambda: summarize_project_sections(readme, no_llm=no_llm, limiter=limiter),
+            should_cache=lambda result: result[1] is not None,
+        )
+
+    projects = []
+    failed = 0
+    stats = RepoStats()
+    readmes = prefetch_readmes(repos, load_readme, lookahead=lookahead)
+    # The limiter, not this lookahead, decides how many requests are actually in flight
+    summary_lookahead = limiter.maximum if (limiter and not no_llm) else 0
+    for (repo, _), result in map_ahead(summarise, readmes, summary_lookahead):
+        if result is None:
+            continue
+        summary, sections = result
+        if sections is None:
+            failed += 1
+            print(f"{tag} ❌ {repo['name']}: {summary}")
+            continue
+        # Sections were validated while streaming; the renderers use them as they are
+        projects.append({'title': repo['name'], 'summary': summary, 'sections': sections})
+        stats.add(repo)
+
+    print(f"{tag} 🤖 {len(projects)} projects summarised ({failed} failed)")
+    basename = os.path.splitext(entry['output'])[0]
+    written = write_outputs(projects, user_name=name, formats=entry['formats'], basename=basename,
+                            stats=stats.to_dict()) if projects else {}
+    ok = len(written) == len(entry['formats'])
+    return {'name': name, 'output': entry['output'], 'projects': len(projects), 'failed': failed, 'ok': ok}
+
+
+def run_batch(entries, workers=4, per_token_concurrency=4, lookahead=4, limiter=None):
+    """Generate every portfolio in the manifest on a shared worker pool.
+    One AdaptiveLimiter is shared by all workers, since they draw on the same Anthropic account.
+    """
+    readme_cache = SharedCache()
+    summary_cache = SharedCache()
+    sessions = {}
+    for entry in entries:
+        if entry['token'] not in sessions:
+            sessions[entry['token']] = BudgetedSession(TokenBudget(per_token_concurrency))
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(generate_portfolio_for, entry, sessions[entry['token']],
+                            readme_cache, summary_cache, lookahead, limiter): entry
+            for entry in interleave_by_token(entries)
+        }
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"[{entry['name']}] ❌ Error: {e}")
+                results.append({'name': entry['name'], 'output': entry['output'], 'projects': 0, 'failed': 0, 'ok': False})
+
+    for session in sessions.values():
+        session.close()
+    return results, readme_cache, summary_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate portfolios for several users from a manifest")
+    parser.add_argument("manifest", help="JSON manifest listing the users to generate portfolios for")
+    parser.add_argument("--workers", type=int, default=4, help="Number of portfolios generated concurrently (default: 4)")
+    parser.add_argument("--per-token-concurrency", type=int, default=4, help="Max concurrent GitHub requests per token (default: 4)")
+    parser.add_argument("--prefetch", type=int, default=4, help="READMEs fetched ahead per user (default: 4)")
+    parser.add_argument("--llm-concurrency", type=positive_int, default=DEFAULT_MAX_CONCURRENCY, help=f"Upper bound for parallel LLM requests across all workers; adapts to rate limits (default: {DEFAULT_MAX_CONCURRENCY})")
+    parser.add_argument("--metrics-json", type=str, default=None, help="Write per-stage timings and counters to this JSON file")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing profile (p50/p95) when the batch ends")
+    parser.add_argument("--theme", type=str, default=None, help="PDF theme name in themes/ or path to a theme JSON file; compiled once for the whole batch")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help=f"Directory for portfolios without an explicit output (default: {DEFAULT_OUTPUT_DIR})")
+    args = parser.parse_args()
+
+    try:
+        entries = load_manifest(args.manifest, args.output_dir)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Invalid manifest: {e}")
+        return 1
+    if not entries:
+        print("❌ Manifest contains no users.")
+        return 1
+    if args.theme:
+        os.environ['PORTFOLIO_THEME'] = args.theme
+    try:
+        load_theme()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Invalid PDF theme: {e}")
+        return 1
+    if not os.getenv('ANTHROPIC_API_KEY') and not all(entry.get('no_llm') for entry in entries):
+        print("❌ Error: ANTHROPIC_API_KEY is required unless every entry sets \"no_llm\": true")
+        return 1
+
+    print(f"🚀 Generating {len(entries)} portfolios with {args.workers} workers...")
+    start = time.time()
+    limiter = AdaptiveLimiter(maximum=args.llm_concurrency)
+    results, readme_cache, summary_cache = run_batch(entries, args.workers, args.per_token_concurrency, args.prefetch, limiter)
+
+    print('\n' + '=' * 60)
+    print('📊 BATCH SUMMARY:')
+    for result in sorted(results, key=lambda r: r['name']):
+        status = '✅' if result['ok'] else '❌'
+        print(f"{status} {result['name']}: {result['projects']} projects -> {result['output']}")
+    print(f"♻️ README cache: {readme_cache.hits} hits, {readme_cache.misses} fetches")
+    print(f"♻️ Summary cache: {summary_cache.hits} hits, {summary_cache.misses} summaries")
+    llm_usage = describe_llm_usage(metrics.counters)
+    if llm_usage:
+        print(f"💸 LLM usage: {llm_usage}")
+        stats = limiter.stats()
+        print(f"🎛️ Adaptive concurrency: limit peaked at {stats['peak_limit']}, ended at {stats['limit']}; "
+              f"{stats['overloads']} rate-limit/overload responses retried")
+    print(f"⏱️ Finished in {time.time() - start:.1f}s")
+    if args.profile:
+        metrics.print_profile()
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+        print(f"📈 Metrics written to {args.metrics_json}")
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Offline benchmark suite: mock GitHub/Anthropic server, synthetic corpus and runner."""
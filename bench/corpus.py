@@ -0,0 +1,80 @@
+"""
+Synthetic repository corpus for benchmarks.
+
+Produces GitHub-shaped repo dicts (the fields the pipeline reads) and README
+texts of a requested size and script mix, deterministically from a seed.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+LANGUAGES = ['Python', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'Java', 'C++', None]
+
+WORDS = {
+    'ascii': "project service api client server data model build deploy test cache queue "
+             "stream parser render config plugin module worker pipeline metrics".split(),
+    'latin': "café naïve résumé façade jalapeño über crème déjà señor Ångström "
+             "smörgåsbord piñata coördinate".split(),
+    'cjk': "项目 服务 数据 模型 构建 部署 测试 缓存 プロジェクト サーバー データ 테스트 서비스".split(),
+    'emoji': "🚀 ✨ 📦 🔧 ⚡ 🐍 🦀 ✅ 📊 🔒".split(),
+}
+
+UNICODE_MIXES = {
+    'ascii': {'ascii': 1.0},
+    'latin': {'ascii': 0.8, 'latin': 0.2},
+    'cjk': {'ascii': 0.5, 'cjk': 0.5},
+    'mixed': {'ascii': 0.7, 'latin': 0.1, 'cjk': 0.1, 'emoji': 0.1},
+}
+
+
+def _words(rng, mix, count):
+    pools = list(mix)
+    weights = [mix[pool] for pool in pools]
+    return [rng.choice(WORDS[pool]) for pool in rng.choices(pools, weights, k=count)]
+
+
+def make_readme(rng, name, size, mix='ascii'):
+    """Build a markdown README of roughly `size` characters"""
+    weights = UNICODE_MIXES[mix]
+    parts = [f"# {name}\n\n", ' '.join(_words(rng, weights, 30)) + ".\n\n", "## Features\n\n"]
+    for _ in range(5):
+        parts.append("- " + ' '.join(_words(rng, weights, 8)) + "\n")
+    parts.append("\n## Usage\n\n```bash\npip install " + name + "\n```\n\n")
+    length = sum(len(part) for part in parts)
+    while length < size:
+        paragraph = ' '.join(_words(rng, weights, 60)) + ".\n\n"
+        parts.append(paragraph)
+        length += len(paragraph)
+    return ''.join(parts)[:max(size, 1)]
+
+
+def generate_corpus(repo_count=100, readme_size=4000, mix='ascii', owner='bench-user',
+                    missing_readme_ratio=0.1, fork_ratio=0.2, seed=42):
+    """Return a list of (repo dict, readme or None) pairs"""
+    if mix not in UNICODE_MIXES:
+        raise ValueError(f"Unknown unicode mix '{mix}' (expected one of {', '.join(UNICODE_MIXES)})")
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    corpus = []
+    for i in range(repo_count):
+        name = f"repo-{i:05d}"
+        pushed = now - timedelta(days=rng.randint(0, 3000))
+        repo = {
+            'id': 100000 + i,
+            'name': name,
+            'full_name': f"{owner}/{name}",
+            'owner': {'login': owner},
+            'private': rng.random() < 0.3,
+            'fork': rng.random() < fork_ratio,
+            'archived': rng.random() < 0.05,
+            'description': ' '.join(_words(rng, UNICODE_MIXES[mix], 8)),
+            'language': rng.choice(LANGUAGES),
+            'stargazers_count': int(rng.paretovariate(1.2)) - 1,
+            'forks_count': int(rng.paretovariate(1.5)) - 1,
+            'size': rng.randint(0, 50000),
+            'pushed_at': pushed.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'updated_at': pushed.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+        readme = None if rng.random() < missing_readme_ratio else make_readme(rng, name, readme_size, mix)
+        corpus.append((repo, readme))
+    return corpus
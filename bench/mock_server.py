@@ -0,0 +1,358 @@
+"""
+Local stand-in for the GitHub REST API and the Anthropic Messages API.
+
+Serves a synthetic corpus with the endpoints the pipeline uses:
+
+    GET  /user                         authenticated user
+    GET  /user/repos, /users/{u}/repos paginated listing with Link headers
+    GET  /repos/{owner}/{repo}/readme  base64 JSON README, or the raw file with
+                                       Accept: application/vnd.github.raw
+    GET  /repos/{owner}/{repo}/languages  bytes per language, derived from the repo's
+                                       language and size
+    GET  /rate_limit                   rate limit status
+    POST /v1/messages                  fake Claude completion with usage, including
+                                       prompt-cache writes/reads for cache_control blocks;
+                                       server-sent events when the body has "stream": true
+
+Every response carries X-RateLimit-* headers, and a fixed latency plus random
+jitter can be injected to mimic network round-trips. With `llm_capacity`, Messages
+requests beyond that many in flight are rejected with 429 (or 529), like an
+account at its concurrency ceiling. With `llm_drift_rate`, that fraction of
+completions drifts from the summary format (a chatty preamble and one long
+unstructured section), to exercise early validation of streamed summaries.
+"""
+
+import json
+import time
+import hashlib
+import base64
+import random
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Smallest cacheable prompt prefix, as on the real API (Sonnet/Opus models)
+MIN_CACHEABLE_TOKENS = 1024
+
+FAKE_SUMMARY = (
+    "**Project Overview:**\n"
+    "A synthetic benchmark project that exercises the portfolio pipeline end to end.\n\n"
+    "**Key Features:**\n"
+    "* Deterministic fixture data\n* Paginated listings\n* Configurable latency\n\n"
+    "**Technologies Used:**\n"
+    "Python, HTTP\n\n"
+    "**Impact & Benefits:**\n"
+    "Makes performance regressions visible without live credentials."
+)
+
+# What a completion looks like when the model ignores the format
+DRIFTED_SUMMARY = (
+    "Sure! Here is a summary of the repository you shared, written for a portfolio.\n\n"
+    + "The project is a synthetic benchmark that exercises the portfolio pipeline end to end, "
+      "with deterministic fixture data, paginated listings and configurable latency. " * 12
+)
+
+# Characters per streamed text delta, roughly a few tokens
+STREAM_CHUNK_CHARS = 16
+
+
+class MockState:
+    """Corpus and counters shared by all request handlers"""
+
+    def __init__(self, corpus, login='bench-user', latency=0.0, jitter=0.0,
+                 llm_latency=0.0, rate_limit=5000, readme_encoding='utf-8', seed=0,
+                 llm_capacity=None, llm_overload_status=429, llm_drift_rate=0.0):
+        self.login = login
+        self.readme_encoding = readme_encoding
+        self.repos = [repo for repo, _ in corpus]
+        self.readmes = {repo['full_name']: readme for repo, readme in corpus}
+        self.repos_by_name = {repo['full_name']: repo for repo in self.repos}
+        self.latency = latency
+        self.jitter = jitter
+        self.llm_latency = llm_latency
+        self.llm_capacity = llm_capacity
+        self.llm_overload_status = llm_overload_status
+        self.llm_in_flight = 0
+        self.llm_rejected = 0
+        self.llm_drift_rate = llm_drift_rate
+        self.llm_drifted = 0
+        self.llm_aborted = 0
+        self.llm_chars_streamed = 0
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + 3600
+        self.requests = 0
+        self.prompt_cache = set()
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+
+    def take_request(self):
+        with self.lock:
+            self.requests += 1
+            if self.remaining > 0:
+                self.remaining -= 1
+                return True
+            return False
+
+    def delay(self, base):
+        with self.lock:
+            extra = self.rng.uniform(0, self.jitter) if self.jitter else 0.0
+        if base or extra:
+            time.sleep(base + extra)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None  # set per server class
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', content_type='application/json', headers=None):
+        state = self.state
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-RateLimit-Limit', str(state.rate_limit))
+        self.send_header('X-RateLimit-Remaining', str(max(state.remaining, 0)))
+        self.send_header('X-RateLimit-Reset', str(state.reset_at))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, json.dumps(payload).encode('utf-8'), headers=headers)
+
+    def do_GET(self):
+        state = self.state
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+
+        state.delay(state.latency)
+        if not state.take_request():
+            return self._send_json(403, {'message': 'API rate limit exceeded'})
+
+        if parts == ['user']:
+            return self._send_json(200, {'login': state.login, 'name': 'Bench User'},
+                                   headers={'X-OAuth-Scopes': 'repo, read:org'})
+        if parts == ['rate_limit']:
+            core = {'limit': state.rate_limit, 'remaining': state.remaining,
+                    'used': state.rate_limit - state.remaining, 'reset': state.reset_at}
+            return self._send_json(200, {'resources': {'core': core}})
+        if parts == ['user', 'repos'] or (len(parts) == 3 and parts[0] == 'users' and parts[2] == 'repos'):
+            return self._listing(url.path, query)
+        if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'readme':
+            return self._readme(f"{parts[1]}/{parts[2]}")
+        if len(parts) == 4 and parts[0] == 'repos' and parts[3] == 'languages':
+            return self._languages(f"{parts[1]}/{parts[2]}")
+        return self._send_json(404, {'message': 'Not Found'})
+
+    def _listing(self, path, query):
+        state = self.state
+        page = int(query.get('page', ['1'])[0])
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        repos = state.repos
+        visibility = query.get('visibility', ['all'])[0]
+        if visibility == 'public':
+            repos = [repo for repo in repos if not repo['private']]
+        elif visibility == 'private':
+            repos = [repo for repo in repos if repo['private']]
+        if 'since' in query:
+            repos = [repo for repo in repos if repo['updated_at'] >= query['since'][0]]
+
+        last_page = max(1, -(-len(repos) // per_page))
+        chunk = repos[(page - 1) * per_page:page * per_page]
+        links = []
+        base = f"http://{self.headers.get('Host')}{path}?per_page={per_page}"
+        if page < last_page:
+            links.append(f'<{base}&page={page + 1}>; rel="next"')
+        links.append(f'<{base}&page={last_page}>; rel="last"')
+        return self._send_json(200, chunk, headers={'Link': ', '.join(links)})
+
+    def _languages(self, full_name):
+        repo = self.state.repos_by_name.get(full_name)
+        if repo is None:
+            return self._send_json(404, {'message': 'Not Found'})
+        total = max(repo.get('size') or 0, 1) * 1024
+        languages = {}
+        if repo.get('language'):
+            languages[repo['language']] = total * 4 // 5
+        # A little markup and scripting alongside the main language
+        languages['Shell'] = total // 10
+        languages['HTML'] = total - sum(languages.values())
+        return self._send_json(200, languages)
+
+    def _readme(self, full_name):
+        readme = self.state.readmes.get(full_name)
+        if readme is None:
+            return self._send_json(404, {'message': 'Not Found'})
+        raw = readme.encode(self.state.readme_encoding, errors='replace')
+        if 'application/vnd.github.raw' in self.headers.get('Accept', ''):
+            return self._send(200, raw, content_type='application/vnd.github.raw')
+        encoded = base64.encodebytes(raw).decode('ascii')
+        return self._send_json(200, {'name': 'README.md', 'size': len(raw),
+                                     'encoding': 'base64', 'content': encoded})
+
+    def do_POST(self):
+        state = self.state
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if urlparse(self.path).path != '/v1/messages':
+            return self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'Not Found'}})
+
+        with state.lock:
+            overloaded = state.llm_capacity is not None and state.llm_in_flight >= state.llm_capacity
+            if overloaded:
+                state.llm_rejected += 1
+            else:
+                state.llm_in_flight += 1
+        if overloaded:
+            error_type = 'rate_limit_error' if state.llm_overload_status == 429 else 'overloaded_error'
+            return self._send_json(state.llm_overload_status,
+                                   {'type': 'error', 'error': {'type': error_type, 'message': 'Too many concurrent requests'}})
+        with state.lock:
+            drifted = state.llm_drift_rate and state.rng.random() < state.llm_drift_rate
+            if drifted:
+                state.llm_drifted += 1
+        text = DRIFTED_SUMMARY if drifted else FAKE_SUMMARY
+        try:
+            if body.get('stream'):
+                return self._stream_message(body, text)
+            state.delay(state.llm_latency)
+        finally:
+            with state.lock:
+                state.llm_in_flight -= 1
+        return self._send_json(200, {
+            'id': 'msg_bench',
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model', 'mock'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': self._usage(body, text),
+        })
+
+    def _stream_message(self, body, text):
+        """Send the completion as Messages API server-sent events, spreading llm_latency over the deltas.
+        Generation stops when the client disconnects, as it does on the real API.
+        """
+        state = self.state
+        usage = self._usage(body, text)
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        # Latency scales with output length; FAKE_SUMMARY takes llm_latency
+        per_chunk = state.llm_latency * STREAM_CHUNK_CHARS / len(FAKE_SUMMARY)
+        message = {'id': 'msg_bench', 'type': 'message', 'role': 'assistant', 'model': body.get('model', 'mock'),
+                   'content': [], 'stop_reason': None, 'stop_sequence': None,
+                   'usage': dict(usage, output_tokens=1)}
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def event(name, payload):
+            self.wfile.write(f"event: {name}\ndata: {json.dumps(dict(payload, type=name))}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        try:
+            event('message_start', {'message': message})
+            event('content_block_start', {'index': 0, 'content_block': {'type': 'text', 'text': ''}})
+            for chunk in chunks:
+                state.delay(per_chunk)
+                event('content_block_delta', {'index': 0, 'delta': {'type': 'text_delta', 'text': chunk}})
+                with state.lock:
+                    state.llm_chars_streamed += len(chunk)
+            event('content_block_stop', {'index': 0})
+            event('message_delta', {'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                                    'usage': {'output_tokens': usage['output_tokens']}})
+            event('message_stop', {})
+        except (BrokenPipeError, ConnectionResetError):
+            with state.lock:
+                state.llm_aborted += 1
+
+    def _usage(self, body, text=FAKE_SUMMARY):
+        """Token usage with the cached prefix (system blocks up to the last cache_control) split out"""
+        system = body.get('system') or []
+        if isinstance(system, str):
+            system = [{'type': 'text', 'text': system}]
+        marked = [i for i, block in enumerate(system) if block.get('cache_control')]
+        prefix = system[:marked[-1] + 1] if marked else []
+        total = (len(json.dumps(system)) + len(json.dumps(body.get('messages', [])))) // 4
+        prefix_tokens = len(json.dumps(prefix)) // 4
+        usage = {'input_tokens': total, 'output_tokens': len(text) // 4,
+                 'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0}
+        if prefix and prefix_tokens >= MIN_CACHEABLE_TOKENS:
+            key = hashlib.sha256((body.get('model', '') + json.dumps(prefix)).encode('utf-8')).hexdigest()
+            with self.state.lock:
+                hit = key in self.state.prompt_cache
+                self.state.prompt_cache.add(key)
+            usage['cache_read_input_tokens' if hit else 'cache_creation_input_tokens'] = prefix_tokens
+            usage['input_tokens'] = total - prefix_tokens
+        return usage
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients legitimately hang up early (e.g. README byte caps)
+        pass
+
+
+class MockServer:
+    """Run the mock API on a background thread; use as a context manager"""
+
+    def __init__(self, corpus, host='127.0.0.1', port=0, **options):
+        self.state = MockState(corpus, **options)
+        handler = type('BoundMockHandler', (MockHandler,), {'state': self.state})
+        self.httpd = QuietHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+if __name__ == '__main__':
+    import argparse
+    from bench.corpus import generate_corpus
+
+    parser = argparse.ArgumentParser(description="Serve a synthetic GitHub/Anthropic API locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repos", type=int, default=200)
+    parser.add_argument("--readme-size", type=int, default=4000)
+    parser.add_argument("--unicode", default='mixed')
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.repos, args.readme_size, args.unicode)
+    server = MockServer(corpus, port=args.port, latency=args.latency)
+    print(f"Mock API listening on {server.url}")
+    print(f"  export GITHUB_API_URL={server.url} ANTHROPIC_BASE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark runner.
+
+Starts the mock GitHub/Anthropic server on a synthetic corpus, then times each
+pipeline stage and an end-to-end run without any live credentials:
+
+    python -m bench.run_bench --repos 300 --readme-size 8000 --unicode mixed
+    python -m bench.run_bench --save-baseline            # record bench/baseline.json
+    python -m bench.run_bench --threshold 0.2            # fail on >20% regressions
+
+Baselines are machine-specific; record them on the machine that compares them.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import contextlib
+
+from bench.corpus import generate_corpus, UNICODE_MIXES
+from bench.mock_server import MockServer, FAKE_SUMMARY
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Regressions smaller than this many seconds are treated as noise
+ABSOLUTE_TOLERANCE_S = 0.005
+
+
+def _configure_environment(server_url):
+    os.environ['GITHUB_API_URL'] = server_url
+    os.environ['ANTHROPIC_BASE_URL'] = server_url
+    os.environ['GITHUB_TOKEN'] = 'bench-token'
+    os.environ['ANTHROPIC_API_KEY'] = 'bench-key'
+    os.environ.pop('PORTFOLIO_NO_LLM', None)
+
+
+def _time(func, repeat):
+    """Median wall time of `repeat` calls plus the last call's result.
+    Metrics are reset before each call, so counters describe a single run.
+    """
+    from metrics import metrics
+
+    timings = []
+    result = None
+    for _ in range(repeat):
+        metrics.reset()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def build_benchmarks(args, workdir):
+    """Return (name, callable) pairs for every benchmark"""
+    from main import get_user_repos, fetch_readme, prefetch_readmes
+    from process import summarize_project, generate_pdf, render_pdf
+    from document import build_document
+    from batch import generate_portfolio_for, SharedCache, BudgetedSession, TokenBudget
+    from concurrency import AdaptiveLimiter, map_ahead
+    from outputs import write_outputs, RENDERERS
+
+    repos = get_user_repos()
+    sample = repos[:args.readme_sample] if args.readme_sample else repos
+    owner = lambda repo: repo['owner']['login']
+    readmes = [fetch_readme(repo['name'], username=owner(repo)) for repo in sample[:args.summaries * 2]]
+    readmes = [readme for readme in readmes if readme != "No README found"][:args.summaries]
+    # Descriptions carry the corpus' script mix, so the PDF benchmarks exercise non-ASCII text
+    projects = [{'title': f"{repo['name']}: {repo['description']}", 'summary': FAKE_SUMMARY} for repo in repos]
+    document = build_document(projects, user_name='Bench User')
+
+    def readme_serial():
+        return [fetch_readme(repo['name'], username=owner(repo)) for repo in sample]
+
+    def readme_prefetch():
+        fetch = lambda repo: fetch_readme(repo['name'], username=owner(repo))
+        return [readme for _, readme in prefetch_readmes(sample, fetch, lookahead=args.prefetch)]
+
+    def summarize():
+        return [summarize_project(readme, no_llm=False) for readme in readmes]
+
+    def summarize_adaptive():
+        limiter = AdaptiveLimiter(maximum=args.llm_concurrency, base_delay=0.1)
+        summarise = lambda readme: summarize_project(readme, no_llm=False, limiter=limiter)
+        return [summary for _, summary in map_ahead(summarise, readmes, limiter.maximum)]
+
+    def pdf():
+        return generate_pdf(projects, user_name='Bench User', output_path=os.path.join(workdir, 'bench.pdf'))
+
+    def pdf_core():
+        return render_pdf(document, os.path.join(workdir, 'bench_core.pdf'), ascii_only=True)
+
+    def pdf_unicode():
+        return render_pdf(document, os.path.join(workdir, 'bench_unicode.pdf'), ascii_only=False)
+
+    def all_formats():
+        return write_outputs(projects, user_name='Bench User', formats=list(RENDERERS),
+                             basename=os.path.join(workdir, 'bench_all'))
+
+    def end_to_end():
+        entry = {'name': 'Bench User', 'token': 'bench-token', 'filters': {}, 'formats': ['pdf'],
+                 'output': os.path.join(workdir, 'e2e.pdf')}
+        session = BudgetedSession(TokenBudget(args.prefetch))
+        try:
+            return generate_portfolio_for(entry, session, SharedCache(), SharedCache(), lookahead=args.prefetch)
+        finally:
+            session.close()
+
+    return [
+        ('get_user_repos', lambda: get_user_repos()),
+        ('fetch_readme.serial', readme_serial),
+        ('fetch_readme.prefetch', readme_prefetch),
+        ('summarize_project', summarize),
+        ('summarize_project.adaptive', summarize_adaptive),
+        ('generate_pdf', pdf),
+        ('generate_pdf.core', pdf_core),
+        ('generate_pdf.unicode', pdf_unicode),
+        ('write_outputs.all', all_formats),
+        ('end_to_end', end_to_end),
+    ]
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (name, current, baseline, ratio) for regressions beyond the threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if current > previous * (1 + threshold) and current - previous > ABSOLUTE_TOLERANCE_S:
+            regressions.append((name, current, previous, current / previous if previous else float('inf')))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the portfolio pipeline")
+    parser.add_argument("--repos", type=int, default=200, help="Number of synthetic repositories (default: 200)")
+    parser.add_argument("--readme-size", type=int, default=4000, help="README size in characters (default: 4000)")
+    parser.add_argument("--unicode", choices=sorted(UNICODE_MIXES), default='mixed', help="Script mix used in READMEs (default: mixed)")
+    parser.add_argument("--latency", type=float, default=0.005, help="Injected GitHub latency in seconds (default: 0.005)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency up to N seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Injected Messages API latency in seconds (default: 0.05)")
+    parser.add_argument("--readme-sample", type=int, default=0, help="Only fetch READMEs for the first N repositories (default: all)")
+    parser.add_argument("--summaries", type=int, default=20, help="READMEs summarised in the summarize_project benchmark (default: 20)")
+    parser.add_argument("--llm-capacity", type=int, default=None, help="Reject Messages requests beyond N in flight with 429 (default: unlimited)")
+    parser.add_argument("--llm-drift-rate", type=float, default=0.0, help="Fraction of completions that drift from the summary format (default: 0)")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="Upper bound for the adaptive summarisation benchmark (default: 16)")
+    parser.add_argument("--prefetch", type=int, default=8, help="Lookahead for prefetch benchmarks (default: 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the median is reported (default: 3)")
+    parser.add_argument("--only", action="append", default=None, help="Run only the named benchmark (repeatable)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against / save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Save these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown vs baseline before failing (default: 0.20)")
+    parser.add_argument("--json", type=str, default=None, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    config = {key: getattr(args, key) for key in
+              ('repos', 'readme_size', 'unicode', 'latency', 'jitter', 'llm_latency', 'llm_capacity',
+               'llm_drift_rate', 'llm_concurrency', 'readme_sample', 'summaries', 'prefetch')}
+    corpus = generate_corpus(args.repos, args.readme_size, args.unicode)
+
+    from metrics import metrics
+
+    results = {}
+    counters = {}
+    with MockServer(corpus, latency=args.latency, jitter=args.jitter, llm_latency=args.llm_latency,
+                    llm_capacity=args.llm_capacity, llm_drift_rate=args.llm_drift_rate) as server, \
+            tempfile.TemporaryDirectory() as workdir:
+        _configure_environment(server.url)
+        print(f"🧪 Mock API on {server.url}: {args.repos} repos, {args.readme_size}-char {args.unicode} READMEs, "
+              f"{args.latency * 1000:.0f}ms latency")
+        for name, func in build_benchmarks(args, workdir):
+            if args.only and name not in args.only:
+                continue
+            seconds, _ = _time(func, args.repeat)
+            results[name] = round(seconds, 4)
+            counters[name] = metrics.summary()['counters']
+            print(f"   {name:<24}{seconds:>9.3f}s   {counters[name]}")
+
+    report = {'config': config, 'results': results, 'counters': counters}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️  No baseline to compare against (use --save-baseline to record one)")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print("⚠️  Baseline was recorded with a different configuration; comparison may be meaningless")
+    regressions = compare(results, baseline, args.threshold)
+    for name, current, previous, ratio in regressions:
+        print(f"❌ Regression in {name}: {current:.3f}s vs baseline {previous:.3f}s ({ratio:.2f}x)")
+    if regressions:
+        return 1
+    print(f"✅ No regressions beyond {args.threshold:.0%} of baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
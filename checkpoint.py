@@ -0,0 +1,132 @@
+"""
+Append-only checkpoint journal for resumable portfolio runs.
+
+Every completed stage (repository listing, README fetch, include decision,
+summary) is written as one JSON line and flushed to disk immediately, so a
+crash or Ctrl-C loses at most the stage that was in flight.
+
+README and summary texts are not kept in memory: the journal remembers the
+byte offset of each entry and reads the value back from disk on demand.
+"""
+
+import json
+import os
+import threading
+
+DEFAULT_CHECKPOINT_PATH = '.portfolio_checkpoint.jsonl'
+
+# Stages whose values are read back from disk instead of held in memory
+SPILLED_STAGES = ('readme', 'summary')
+
+
+def repo_key(repo):
+    """Stable journal key for a repository (owner/name when available)"""
+    return repo.get('full_name') or repo['name']
+
+
+class CheckpointJournal:
+    """JSON Lines journal recording completed stages per repository"""
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, resume=False):
+        self.path = path
+        self.meta = {}
+        self.repos = None
+        self.stages = {'readme': {}, 'decision': {}, 'summary': {}}
+        self._reader = None
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(path):
+            end = self._load()
+            self._file = open(path, 'r+b')
+            # Drop a truncated last line so the next entry starts on a fresh line
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(path, 'wb')
+
+    def _load(self):
+        """Replay the journal; returns the offset just past the last complete entry"""
+        offset = end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                start, offset = offset, offset + len(line)
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('incomplete line')
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a truncated last line; ignore it
+                    continue
+                self._apply(entry, start)
+                end = offset
+        return end
+
+    def _apply(self, entry, offset):
+        stage = entry.get('stage')
+        if stage == 'meta':
+            self.meta.update(entry.get('data', {}))
+        elif stage == 'repos':
+            self.repos = entry.get('repos')
+        elif stage in SPILLED_STAGES:
+            self.stages[stage][entry['repo']] = offset
+        elif stage in self.stages:
+            self.stages[stage][entry['repo']] = entry.get('value')
+
+    def _write(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(entry, offset)
+
+    def _read_value(self, offset):
+        with self._lock:
+            if self._reader is None:
+                self._reader = open(self.path, 'rb')
+            self._reader.seek(offset)
+            line = self._reader.readline()
+        return json.loads(line).get('value')
+
+    @property
+    def completed_entries(self):
+        """Number of per-repo stages already recorded"""
+        return sum(len(values) for values in self.stages.values())
+
+    def record_meta(self, **data):
+        self._write({'stage': 'meta', 'data': data})
+
+    def record_repos(self, repos):
+        self._write({'stage': 'repos', 'repos': [repo.to_dict() if hasattr(repo, 'to_dict') else repo for repo in repos]})
+        # Keep the caller's (compact) objects rather than the serialised copies
+        self.repos = repos
+
+    def record(self, stage, repo, value):
+        """Record that `stage` finished for `repo` with the given result"""
+        self._write({'stage': stage, 'repo': repo_key(repo), 'value': value})
+
+    def get(self, stage, repo, default=None):
+        key = repo_key(repo)
+        if key not in self.stages[stage]:
+            return default
+        if stage in SPILLED_STAGES:
+            return self._read_value(self.stages[stage][key])
+        return self.stages[stage][key]
+
+    def has(self, stage, repo):
+        return repo_key(repo) in self.stages[stage]
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if self._reader is not None:
+            self._reader.close()
+
+    def discard(self):
+        """Close and delete the journal once the run has completed"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
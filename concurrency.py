@@ -0,0 +1,190 @@
+"""
+Adaptive concurrency for LLM requests.
+
+AdaptiveLimiter caps the number of in-flight requests and tunes the cap with
+AIMD (additive increase, multiplicative decrease): one more slot after every
+full window of healthy requests, and a 30% cut when the API answers 429 (rate
+limited) or 529 (overloaded). Until the first such response the limit grows by
+one per success (slow start, doubling every window). Rejected calls are retried
+with backoff instead of being dropped. Latency gates growth: while it runs well
+above the best latency seen, the limit holds instead of climbing into a queue.
+"""
+
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+DEFAULT_INITIAL_CONCURRENCY = 2
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+def positive_int(value):
+    """argparse type for concurrency limits: an integer of at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+class Overloaded(Exception):
+    """Raised by AdaptiveLimiter.call when a request is still rejected after every retry"""
+
+
+class AdaptiveLimiter:
+    """AIMD limiter for concurrent calls to a rate-limited service"""
+
+    def __init__(self, initial=DEFAULT_INITIAL_CONCURRENCY, minimum=1, maximum=DEFAULT_MAX_CONCURRENCY,
+                 backoff=0.7, latency_tolerance=2.0, max_retries=6, base_delay=1.0, max_delay=60.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.successes = 0
+        self.overloads = 0
+        self.retries = 0
+        self.best_latency = None
+        self.avg_latency = None
+        self._healthy_streak = 0
+        self._slow_start = True
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot is free; returns the monotonic start time"""
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, started, latency):
+        with self._cond:
+            self.successes += 1
+            # The baseline drifts up slowly so one unusually quick reply does not stall growth
+            self.best_latency = latency if self.best_latency is None else min(self.best_latency * 1.02, latency)
+            self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+            if self.avg_latency > self.best_latency * self.latency_tolerance:
+                # Slower than usual: the service is queueing our requests, so hold
+                self._healthy_streak = 0
+                return
+            self._healthy_streak += 1
+            window = 1 if self._slow_start else self.limit
+            if self._healthy_streak >= window and self.limit < self.maximum:
+                self.limit += 1
+                self.peak_limit = max(self.peak_limit, self.limit)
+                self._healthy_streak = 0
+                self._cond.notify_all()
+
+    def on_overload(self, started):
+        with self._cond:
+            self.overloads += 1
+            self._healthy_streak = 0
+            # Requests already in flight when we backed off report the same
+            # congestion; cut only once per episode
+            if started < self._last_decrease:
+                return
+            self.limit = max(self.minimum, int(self.limit * self.backoff))
+            self._slow_start = False
+            self._last_decrease = time.monotonic()
+        metrics.incr('llm_backoffs')
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def call(self, func, classify=lambda exc: None, retry_after=lambda exc: None):
+        """Run `func` within the limit, retrying rejected calls.
+        `classify(exc)` returns 'overload' (429/529: back off and retry),
+        'transient' (retry without backing off) or None (re-raise).
+        """
+        for attempt in range(self.max_retries + 1):
+            started = self.acquire()
+            try:
+                result = func()
+            except Exception as e:
+                error = e
+                kind = classify(e)
+                if kind is None or attempt == self.max_retries:
+                    if kind == 'overload':
+                        self.on_overload(started)
+                        raise Overloaded(f"still overloaded after {self.max_retries} retries: {e}") from e
+                    raise
+                if kind == 'overload':
+                    self.on_overload(started)
+            else:
+                self.on_success(started, time.monotonic() - started)
+                return result
+            finally:
+                self.release()
+            with self._cond:
+                self.retries += 1
+            metrics.incr('llm_retries')
+            time.sleep(self._delay(attempt, retry_after(error)))
+
+    def describe(self):
+        """Short state line for progress output, e.g. 'limit 6, 5 in flight, avg 3.1s'"""
+        with self._cond:
+            latency = f", avg {self.avg_latency:.1f}s" if self.avg_latency is not None else ""
+            return f"limit {self.limit}, {self.in_flight} in flight{latency}"
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'peak_limit': self.peak_limit,
+                'successes': self.successes,
+                'overloads': self.overloads,
+                'retries': self.retries,
+                'avg_latency_s': round(self.avg_latency, 3) if self.avg_latency is not None else None,
+            }
+
+
+_END = object()
+
+
+def map_ahead(func, items, lookahead=8):
+    """Yield (item, func(item)) in input order while running up to `lookahead` calls ahead in the background"""
+    if lookahead < 1:
+        for item in items:
+            yield item, func(item)
+        return
+    
+    executor = ThreadPoolExecutor(max_workers=lookahead)
+    pending = []
+    item_iter = iter(items)
+    try:
+        for item in item_iter:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= lookahead:
+                break
+        while pending:
+            item, future = pending.pop(0)
+            next_item = next(item_iter, _END)
+            if next_item is not _END:
+                pending.append((next_item, executor.submit(func, next_item)))
+            yield item, future.result()
+    finally:
+        # Drop queued calls if the consumer stops early (quit, Ctrl-C)
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,143 @@
+"""
+README deduplication before summarisation.
+
+Org accounts are full of repositories that share a template README (starter
+kits, course assignments, mirrored forks). Repos are grouped by a hash of their
+normalised README, or, in near mode, by SimHash fingerprints of word shingles.
+Only one representative per group is summarised; its summary is either fanned
+out to every member or the group is collapsed into one portfolio entry.
+"""
+
+import re
+import hashlib
+from collections import Counter
+from operator import itemgetter
+
+DEDUP_MODES = ('exact', 'near', 'off')
+DEDUP_ACTIONS = ('fanout', 'collapse')
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+# Max differing bits for two READMEs to count as near-duplicates
+NEAR_DUPLICATE_DISTANCE = 6
+# Shorter READMEs have too few shingles for a meaningful fingerprint
+NEAR_MIN_WORDS = 20
+
+_WORD_RE = re.compile(r'\w+')
+# For each bit offset, picks the byte values that have that bit set
+_BIT_SELECTORS = [itemgetter(*[value for value in range(256) if value >> offset & 1]) for offset in range(8)]
+
+
+def add_dedup_arguments(parser):
+    """Register the deduplication flags on an argparse parser"""
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default='exact',
+                        help="Group repositories with identical (exact) or near-identical (near) READMEs "
+                             "and summarise each group once (default: exact)")
+    parser.add_argument("--dedup-action", choices=DEDUP_ACTIONS, default='fanout',
+                        help="fanout: reuse the summary for every repo in a group; "
+                             "collapse: one portfolio entry per group (default: fanout)")
+
+
+def readme_digest(readme):
+    """sha256 of a README with line endings and trailing whitespace normalised"""
+    lines = (readme or '').replace('\r\n', '\n').split('\n')
+    normalized = '\n'.join(line.rstrip() for line in lines).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def simhash(text, bits=SIMHASH_BITS, shingle_size=SHINGLE_SIZE):
+    """SimHash of the word shingles in `text`, or None if the text is too short"""
+    words = _WORD_RE.findall((text or '').lower())
+    if len(words) < NEAR_MIN_WORDS:
+        return None
+    weights = Counter(map(' '.join, zip(*(words[k:] for k in range(shingle_size)))))
+
+    # Tally weights per (byte position, byte value) and expand to bits afterwards:
+    # 8 updates per shingle instead of 64
+    width = bits // 8
+    tallies = [[0] * 256 for _ in range(width)]
+    for shingle, weight in weights.items():
+        # blake2b rather than hash(): fingerprints must be stable across processes
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=width).digest()
+        for tally, value in zip(tallies, digest):
+            tally[value] += weight
+
+    total_weight = sum(weights.values())
+    totals = []
+    for bit in range(bits):
+        position, offset = divmod(bit, 8)
+        counts = tallies[width - 1 - position]  # big-endian: the last byte holds bits 0-7
+        on = sum(_BIT_SELECTORS[offset](counts))
+        totals.append(2 * on - total_weight)
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint, bands, bits=SIMHASH_BITS):
+    width = bits // bands
+    mask = (1 << width) - 1
+    return [(band, fingerprint >> (band * width) & mask) for band in range(bands)]
+
+
+def group_readmes(readmes, mode='exact', max_distance=NEAR_DUPLICATE_DISTANCE):
+    """Group README indices into duplicate sets.
+    Returns a list of index lists in first-seen order; the first index of each
+    group is its representative. Mode 'off' puts every README in its own group.
+    `readmes` may be any iterable; only digests and fingerprints are kept.
+    """
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode '{mode}' (expected one of {', '.join(DEDUP_MODES)})")
+    if mode == 'off':
+        return [[i] for i, _ in enumerate(readmes)]
+
+    groups = []
+    by_digest = {}
+    # near mode: band value -> groups whose representative has it. Splitting the
+    # fingerprint into max_distance + 1 bands guarantees (pigeonhole) that two
+    # fingerprints within max_distance bits share at least one whole band.
+    band_index = {}
+    fingerprints = {}
+    bands = max_distance + 1
+    for i, readme in enumerate(readmes):
+        digest = readme_digest(readme)
+        group = by_digest.get(digest)
+        if group is None and mode == 'near':
+            fingerprint = simhash(readme)
+            if fingerprint is not None:
+                for key in _bands(fingerprint, bands):
+                    for candidate in band_index.get(key, ()):
+                        if hamming_distance(fingerprint, fingerprints[candidate[0]]) <= max_distance:
+                            group = candidate
+                            break
+                    if group is not None:
+                        break
+                if group is None:
+                    fingerprints[i] = fingerprint
+                    group = []
+                    for key in _bands(fingerprint, bands):
+                        band_index.setdefault(key, []).append(group)
+                    groups.append(group)
+        if group is None:
+            group = []
+            groups.append(group)
+        by_digest.setdefault(digest, group)
+        group.append(i)
+    return groups
+
+
+def collapse_summary(summary, related_names):
+    """Append the other members of a collapsed group to the representative's summary"""
+    if not related_names:
+        return summary
+    return f"{summary.rstrip()}\n\n**Related Repositories:**\n{', '.join(related_names)}"
+
+
+def describe_groups(groups):
+    """One-line description of the savings, e.g. '12 repositories in 4 groups; 8 LLM calls avoided'"""
+    duplicates = [group for group in groups if len(group) > 1]
+    avoided = sum(len(group) - 1 for group in duplicates)
+    return (f"{sum(len(group) for group in duplicates)} repositories in {len(duplicates)} duplicate group(s); "
+            f"{avoided} summaries avoided")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+GitHub token diagnostics.
+
+Every probe (token info, endpoint access, repository counts, rate limit) runs
+concurrently over one pooled session, so a full report takes about one
+round-trip. Repositories are counted with per_page=1 listings and the Link
+header's last page (main.count_user_repos) instead of downloading them, and
+list endpoints are probed with per_page=1 too.
+
+    python diagnostics.py                      # everything
+    python diagnostics.py --section repos      # one part of the report
+"""
+
+import datetime
+import argparse
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from main import _api_url, _github_get, count_user_repos
+
+load_dotenv('.env.local')
+
+ENDPOINT_PROBES = [
+    ('📁 Repository access', '/user/repos'),
+    ('👥 Organization access', '/user/orgs'),
+    ('⭐ Starred repos access', '/user/starred'),
+    ('👥 Following access', '/user/following'),
+    ('🔔 Notifications access', '/notifications'),
+    ('🔑 SSH Keys access', '/user/keys'),
+    ('📧 Email access', '/user/emails'),
+]
+
+# label -> listing params; each listing is counted in total and, unless it
+# is already limited to one visibility, for private repositories only
+REPO_LISTINGS = [
+    ('All repos (default)', {}),
+    ('All repos (explicit)', {'visibility': 'all'}),
+    ('Public repos only', {'visibility': 'public'}),
+    ('Private repos only', {'visibility': 'private'}),
+    ('Owner repos', {'affiliation': 'owner'}),
+    ('All affiliations', {'affiliation': 'owner,collaborator,organization_member'}),
+]
+PRIVATE_SAMPLE_SIZE = 3
+
+SECTIONS = ('token', 'endpoints', 'repos', 'rate_limit')
+
+
+def pooled_session(size=16):
+    """requests.Session with a connection pool large enough for every probe at once"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _status(session, token, path):
+    # per_page=1: only the status matters, not the payload
+    return _github_get(_api_url(path), token, session, params={'per_page': 1}).status_code
+
+
+def diagnose(sections=SECTIONS, token=None, session=None):
+    """Run the probes for the requested report sections concurrently and collect the results"""
+    # key -> probe(session)
+    probes = {'user': lambda http: _github_get(_api_url('/user'), token, http)}
+    if 'endpoints' in sections:
+        for label, path in ENDPOINT_PROBES:
+            probes[('endpoint', label)] = lambda http, path=path: _status(http, token, path)
+    if 'repos' in sections:
+        for label, params in REPO_LISTINGS:
+            probes[('total', label)] = lambda http, params=params: count_user_repos(params, token, http)
+            if params.get('visibility', 'all') == 'all':
+                private = {**params, 'visibility': 'private'}
+                probes[('private', label)] = lambda http, private=private: count_user_repos(private, token, http)
+        probes['private_sample'] = lambda http: _github_get(
+            _api_url('/user/repos'), token, http, params={'visibility': 'private', 'per_page': PRIVATE_SAMPLE_SIZE})
+    if 'rate_limit' in sections:
+        probes['rate_limit'] = lambda http: _github_get(_api_url('/rate_limit'), token, http)
+
+    own_session = session is None
+    session = session or pooled_session(len(probes))
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            futures = {key: executor.submit(probe, session) for key, probe in probes.items()}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    results[key] = e
+    finally:
+        if own_session:
+            session.close()
+
+    user = results['user']
+    report = {'sections': sections, 'user_status': getattr(user, 'status_code', None), 'error': None}
+    if isinstance(user, Exception):
+        report['error'] = str(user)
+        return report
+    if user.status_code != 200:
+        report['error'] = user.text
+        return report
+    report['user'] = user.json()
+    report['scopes'] = user.headers.get('X-OAuth-Scopes', '')
+    report['oauth_headers'] = {key: value for key, value in user.headers.items()
+                               if 'scope' in key.lower() or 'oauth' in key.lower()}
+    report['endpoints'] = [(label, results[('endpoint', label)]) for label, _ in ENDPOINT_PROBES if ('endpoint', label) in results]
+    if 'repos' in sections:
+        counts = []
+        for label, params in REPO_LISTINGS:
+            total = results[('total', label)]
+            visibility = params.get('visibility')
+            private = results.get(('private', label), total if visibility == 'private' else 0)
+            counts.append((label, total, private))
+        report['repo_counts'] = counts
+        sample = results['private_sample']
+        report['private_sample'] = sample.json() if getattr(sample, 'status_code', None) == 200 else []
+    rate = results.get('rate_limit')
+    if getattr(rate, 'status_code', None) == 200:
+        report['rate_limit'] = rate.json()['resources']['core']
+    return report
+
+
+def print_report(report):
+    """Print the collected diagnostics as one report"""
+    sections = report['sections']
+    if report['error'] is not None:
+        print(f'❌ Token validation failed: {report["user_status"] or "request error"}')
+        print(f'Response: {report["error"]}')
+        return
+
+    user = report['user']
+    if 'token' in sections:
+        print(f'✅ Token is valid and active')
+        print(f'👤 User: {user["login"]} ({user.get("name", "No name")})')
+        print(f'📧 Email: {user.get("email", "Private")}')
+        print(f'🏢 Company: {user.get("company", "None")}')
+        print(f'📍 Location: {user.get("location", "Not specified")}')
+        print(f'📅 Account created: {(user.get("created_at") or "Unknown")[:10]}')
+        print()
+        if report['oauth_headers']:
+            print('🔐 Token Response Headers:')
+        for key, value in report['oauth_headers'].items():
+            print(f'   {key}: {value}')
+        print(f'🔑 Token Scopes: {report["scopes"] or "Unable to determine"}')
+
+    if 'endpoints' in sections:
+        print('\n🧪 Testing API Endpoint Access:')
+        for label, status in report['endpoints']:
+            if isinstance(status, Exception):
+                print(f'   ❌ {label}: Error - {status}')
+            else:
+                print(f'   {"✅" if status == 200 else "❌"} {label}: {status}')
+
+    if 'repos' in sections:
+        print('\n📁 Repository Counts:')
+        for label, total, private in report['repo_counts']:
+            if isinstance(total, Exception):
+                print(f'   ❌ {label}: {total}')
+            elif isinstance(private, Exception):
+                print(f'   ✅ {label}: Total: {total} (private count failed: {private})')
+            else:
+                print(f'   ✅ {label}: Total: {total}, Public: {total - private}, Private: {private}')
+        sample = report['private_sample']
+        if sample:
+            print('   Private repos found:')
+            for repo in sample:
+                print(f'     - {repo["name"]} ({repo.get("language") or "Unknown"})')
+            private_total = dict((label, total) for label, total, _ in report['repo_counts'])['Private repos only']
+            if isinstance(private_total, int) and private_total > len(sample):
+                print(f'     ... and {private_total - len(sample)} more')
+        default_private = report['repo_counts'][0][2]
+        if default_private == 0:
+            print('   ⚠️  No private repositories in the default listing, which is what main.get_user_repos uses!')
+            print('      The token likely lacks the "repo" scope.')
+
+    if 'rate_limit' in sections and 'rate_limit' in report:
+        core = report['rate_limit']
+        print(f'\n📊 Rate Limit Status:')
+        print(f'   Limit: {core["limit"]} requests/hour')
+        print(f'   Used: {core["used"]} requests')
+        print(f'   Remaining: {core["remaining"]} requests')
+        reset_datetime = datetime.datetime.fromtimestamp(core["reset"])
+        print(f'   Resets at: {reset_datetime.strftime("%Y-%m-%d %H:%M:%S")}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a GitHub token's validity, scopes, access and repository counts")
+    parser.add_argument("--section", choices=SECTIONS, action="append", default=None,
+                        help="Only include this part of the report (repeatable; default: all)")
+    args = parser.parse_args()
+
+    print('🔐 Running GitHub token diagnostics...')
+    print('=' * 60)
+    print_report(diagnose(tuple(args.section or SECTIONS)))
+
+
+if __name__ == '__main__':
+    main()
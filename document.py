@@ -0,0 +1,159 @@
+"""
+Format-independent portfolio document.
+
+Summaries are parsed once into sections of paragraph/bullet blocks; every
+output format (PDF, HTML, Markdown, JSON) renders from this structure. An
+optional 'stats' entry (stats.RepoStats.to_dict) adds an overview page.
+"""
+
+from datetime import datetime
+
+PORTFOLIO_TITLE = 'GitHub Portfolio'
+PORTFOLIO_SUBTITLE = 'Project Showcase & Technical Summary'
+
+
+class SummaryParser:
+    """Incremental parser for '**Heading:**' formatted summaries.
+    Text can be fed in arbitrary chunks (e.g. as an LLM streams it). Bold text is a heading
+    only when it opens a line; bold inside a line or a bullet (e.g. '* **Fast:** ...') stays
+    part of that line without the markers. `sections` holds every heading seen so far.
+    """
+
+    def __init__(self):
+        self.sections = []
+        self.pending = ''  # text after the last '**' delimiter
+        self._text = ''  # body text since the last heading
+        self._current = None
+        self._bold = None  # None, 'heading' (bold opening a line) or 'inline'
+
+    def feed(self, text):
+        self.pending += text
+        while True:
+            end = self.pending.find('**')
+            if end < 0:
+                break
+            part = self.pending[:end].replace('\r\n', '\n')
+            self.pending = self.pending[end + 2:]
+            self._delimiter(part)
+        return self.sections
+
+    def close(self):
+        """Parse the remaining text and return the sections"""
+        part = self.pending.replace('\r\n', '\n')
+        self.pending = ''
+        if self._bold == 'heading' and ':' in part:
+            self._delimiter(part)
+        else:
+            self._text += part
+        self._bold = None
+        self._finish_text()
+        return self.sections
+
+    @property
+    def in_heading(self):
+        """True while the pending text sits between a line-opening '**' and its closing '**'"""
+        return self._bold == 'heading'
+
+    @property
+    def buffered(self):
+        """Characters fed but not yet turned into headings or blocks"""
+        return len(self._text) + len(self.pending)
+
+    def _delimiter(self, part):
+        if self._bold is None:
+            self._text += part
+            line = self._text[self._text.rfind('\n') + 1:]
+            self._bold = 'inline' if line.strip() else 'heading'
+        elif self._bold == 'heading' and ':' in part:
+            self._finish_text()
+            self._current = {'heading': part.strip(), 'blocks': []}
+            self.sections.append(self._current)
+            self._bold = None
+        else:
+            self._text += part
+            self._bold = None
+
+    def _finish_text(self):
+        text, self._text = self._text, ''
+        if not text.strip():
+            return
+        if self._current is None:
+            self._current = {'heading': None, 'blocks': []}
+            self.sections.append(self._current)
+        for line in text.strip().split('\n'):
+            line = line.strip()
+            if line.startswith(('*', '•')):
+                self._current['blocks'].append({'type': 'bullet', 'text': line.lstrip('*•').strip()})
+            elif line:
+                self._current['blocks'].append({'type': 'paragraph', 'text': line})
+
+
+def parse_summary(summary):
+    """Split a '**Heading:**' formatted summary into sections of blocks.
+    Text before the first heading goes into a section with heading None.
+    """
+    parser = SummaryParser()
+    parser.feed(summary or '')
+    return parser.close()
+
+
+OVERVIEW_TITLE = 'Portfolio Overview'
+
+
+def overview_figures(stats):
+    """(label, value) pairs for the headline numbers of an overview page"""
+    figures = [
+        ('Repositories', f"{stats['total_repos']} ({stats['public_repos']} public, {stats['private_repos']} private)"),
+        ('Stars', f"{stats['total_stars']:,}"),
+        ('Forks', f"{stats['total_forks']:,}"),
+    ]
+    if stats['forked_repos']:
+        figures.append(('Forked repositories', str(stats['forked_repos'])))
+    if stats['archived_repos']:
+        figures.append(('Archived repositories', str(stats['archived_repos'])))
+    return figures
+
+
+def format_bytes(size):
+    """Human-readable byte count, e.g. '1.2 MB'"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:,.0f} {unit}" if unit == 'B' else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def document_text(document):
+    """Every string a renderer lays out (titles, headings, blocks, overview names)"""
+    yield document['title']
+    yield document['subtitle']
+    yield document['user_name'] or ''
+    for project in document['projects']:
+        yield project['title']
+        for section in project['sections']:
+            yield section['heading'] or ''
+            for block in section['blocks']:
+                yield block['text']
+    stats = document.get('stats') or {}
+    for key in ('languages', 'language_bytes', 'most_starred', 'recently_updated'):
+        for entry in stats.get(key, ()):
+            yield entry['name']
+
+
+def build_document(projects, user_name=None, generated_on=None, stats=None):
+    """Build the shared document every renderer consumes"""
+    generated_on = generated_on or datetime.now()
+    return {
+        'title': PORTFOLIO_TITLE,
+        'subtitle': PORTFOLIO_SUBTITLE,
+        'user_name': user_name,
+        'generated_on': generated_on.strftime("%B %d, %Y"),
+        'stats': stats,
+        'projects': [
+            {
+                'number': i,
+                'title': project['title'],
+                'sections': project.get('sections') or parse_summary(project['summary']),
+            }
+            for i, project in enumerate(projects, 1)
+        ],
+    }
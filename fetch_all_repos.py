@@ -4,13 +4,23 @@ Fetch and display all GitHub repositories accessible with the token
 """
 
 import os
+import argparse
 from dotenv import load_dotenv
 from main import get_user_repos, get_github_username
+from stats import RepoStats, LanguageCache, fetch_language_bytes, DEFAULT_TOP, LANGUAGE_CACHE_PATH
 
 # Load environment variables
 load_dotenv('.env.local')
 
 def main():
+    parser = argparse.ArgumentParser(description="List every repository accessible with the token, with summary statistics")
+    parser.add_argument("--languages", action="store_true",
+                        help="Also fetch per-language byte counts for every repository (one API request each, cached)")
+    parser.add_argument("--language-cache", type=str, default=LANGUAGE_CACHE_PATH,
+                        help=f"Cache file for language byte counts (default: {LANGUAGE_CACHE_PATH})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Length of the top lists (default: {DEFAULT_TOP})")
+    args = parser.parse_args()
+    
     try:
         print('🔍 Fetching ALL GitHub repositories accessible with your token...')
         print('=' * 70)
@@ -22,12 +32,8 @@ def main():
         print(f'📁 Total repositories found: {len(repos)}')
         print('=' * 70)
         
-        # Group repos by language for better overview
-        languages = {}
-        private_count = 0
-        public_count = 0
-        total_stars = 0
-        total_forks = 0
+        # Statistics are accumulated in the same pass that prints the list
+        stats = RepoStats(top=args.top)
         
         print('\n📋 Complete Repository List:')
         print('-' * 70)
@@ -43,17 +49,7 @@ def main():
             stars = repo.get('stargazers_count', 0)
             forks = repo.get('forks_count', 0)
             
-            # Count stats
-            if private:
-                private_count += 1
-            else:
-                public_count += 1
-                
-            total_stars += stars
-            total_forks += forks
-                
-            if lang and lang != 'Unknown':
-                languages[lang] = languages.get(lang, 0) + 1
+            stats.add(repo)
             
             # Display repo info
             privacy_icon = '🔒' if private else '🌐'
@@ -70,32 +66,35 @@ def main():
         
         print('=' * 70)
         print('📊 SUMMARY STATISTICS:')
-        print(f'🌐 Public repositories: {public_count}')
-        print(f'🔒 Private repositories: {private_count}')
-        print(f'📁 Total repositories: {len(repos)}')
-        print(f'⭐ Total stars: {total_stars}')
-        print(f'🍴 Total forks: {total_forks}')
+        print(f'🌐 Public repositories: {stats.public}')
+        print(f'🔒 Private repositories: {stats.private}')
+        print(f'📁 Total repositories: {stats.total}')
+        print(f'⭐ Total stars: {stats.stars}')
+        print(f'🍴 Total forks: {stats.forks}')
         
         print('\n💻 Programming Languages Used:')
-        for lang, count in sorted(languages.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / len(repos)) * 100
+        for lang, count in stats.top_languages():
+            percentage = (count / stats.total) * 100
             print(f'   {lang}: {count} repos ({percentage:.1f}%)')
+        
+        if args.languages:
+            cache = LanguageCache(args.language_cache)
+            fetched = fetch_language_bytes(stats, repos, cache=cache)
+            total_bytes = sum(stats.language_bytes.values())
+            print(f'\n📦 Code by Language ({fetched} fetched, {cache.hits} cached):')
+            for lang, size in stats.top_language_bytes():
+                print(f'   {lang}: {size / 1024:,.0f} KB ({size / total_bytes * 100:.1f}%)')
             
         # Find most recently updated repos
-        print('\n🕒 Most Recently Updated (Top 5):')
-        sorted_repos = sorted(repos, key=lambda x: x.get('updated_at', ''), reverse=True)
-        for i, repo in enumerate(sorted_repos[:5], 1):
-            updated = repo.get('updated_at', 'Unknown')[:10]
-            print(f'   {i}. {repo["name"]} - {updated}')
+        print(f'\n🕒 Most Recently Updated (Top {args.top}):')
+        for i, (name, updated) in enumerate(stats.most_recent(), 1):
+            print(f'   {i}. {name} - {updated}')
             
         # Find repos with most stars
-        if total_stars > 0:
+        if stats.stars > 0:
             print('\n⭐ Most Starred Repositories:')
-            starred_repos = [r for r in repos if r.get('stargazers_count', 0) > 0]
-            starred_repos.sort(key=lambda x: x.get('stargazers_count', 0), reverse=True)
-            for i, repo in enumerate(starred_repos[:5], 1):
-                stars = repo.get('stargazers_count', 0)
-                print(f'   {i}. {repo["name"]} - ⭐{stars}')
+            for i, (name, stars) in enumerate(stats.most_starred(), 1):
+                print(f'   {i}. {name} - ⭐{stars}')
                 
     except Exception as e:
         print(f'❌ Error: {e}')
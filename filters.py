@@ -0,0 +1,163 @@
+"""
+Declarative repository filters applied to the listing metadata before any
+README is requested.
+
+Filters come from a JSON config file and/or CLI flags (flags win). Filters the
+GitHub API can evaluate itself are pushed into the /user/repos query string;
+everything else is checked locally against fields already in the listing.
+"""
+
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_FILTERS = {
+    'skip_forks': False,
+    'skip_archived': False,
+    'visibility': 'all',          # all | public | private
+    'pushed_within_days': None,
+    'min_stars': None,
+    'languages': [],              # include only these languages (empty = any)
+    'exclude_languages': [],
+    'min_size': None,             # KB, as reported by GitHub
+    'max_size': None,
+}
+
+VISIBILITIES = ('all', 'public', 'private')
+
+
+def load_filter_config(path):
+    """Load filter settings from a JSON file, rejecting unknown keys"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    unknown = set(config) - set(DEFAULT_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filter option(s) in {path}: {', '.join(sorted(unknown))}")
+    return config
+
+
+def add_filter_arguments(parser):
+    """Register the repository filter flags on an argparse parser"""
+    group = parser.add_argument_group("repository filters")
+    group.add_argument("--filters", type=str, default=None, help="JSON file with repository filter settings")
+    group.add_argument("--skip-forks", action="store_true", default=None, help="Skip forked repositories")
+    group.add_argument("--skip-archived", action="store_true", default=None, help="Skip archived repositories")
+    group.add_argument("--visibility", choices=VISIBILITIES, default=None, help="Only include public or private repositories")
+    group.add_argument("--pushed-within-days", type=int, default=None, help="Only include repositories pushed to in the last N days")
+    group.add_argument("--min-stars", type=int, default=None, help="Only include repositories with at least N stars")
+    group.add_argument("--language", dest="languages", action="append", default=None, help="Only include this language (repeatable)")
+    group.add_argument("--exclude-language", dest="exclude_languages", action="append", default=None, help="Skip this language (repeatable)")
+    group.add_argument("--min-size", type=int, default=None, help="Only include repositories of at least N KB")
+    group.add_argument("--max-size", type=int, default=None, help="Only include repositories of at most N KB")
+
+
+def build_filters(args=None, config=None):
+    """Merge defaults, config file settings and CLI flags into one filter spec"""
+    filters = dict(DEFAULT_FILTERS)
+    if config:
+        filters.update(config)
+    if args is not None:
+        for key in DEFAULT_FILTERS:
+            value = getattr(args, key, None)
+            if value is not None:
+                filters[key] = value
+    if filters['visibility'] not in VISIBILITIES:
+        raise ValueError(f"Invalid visibility '{filters['visibility']}' (expected one of {', '.join(VISIBILITIES)})")
+    return filters
+
+
+def describe_filters(filters):
+    """Short human-readable list of the active filters"""
+    parts = []
+    if filters['skip_forks']:
+        parts.append("no forks")
+    if filters['skip_archived']:
+        parts.append("no archived")
+    if filters['visibility'] != 'all':
+        parts.append(f"{filters['visibility']} only")
+    if filters['pushed_within_days'] is not None:
+        parts.append(f"pushed within {filters['pushed_within_days']} days")
+    if filters['min_stars'] is not None:
+        parts.append(f"stars >= {filters['min_stars']}")
+    if filters['languages']:
+        parts.append(f"languages: {', '.join(filters['languages'])}")
+    if filters['exclude_languages']:
+        parts.append(f"excluding: {', '.join(filters['exclude_languages'])}")
+    if filters['min_size'] is not None:
+        parts.append(f"size >= {filters['min_size']} KB")
+    if filters['max_size'] is not None:
+        parts.append(f"size <= {filters['max_size']} KB")
+    return parts
+
+
+def _pushed_cutoff(filters):
+    days = filters['pushed_within_days']
+    if days is None:
+        return None
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def listing_query_params(filters):
+    """Query parameters for /user/repos that let GitHub apply filters server-side"""
+    params = {}
+    if filters['visibility'] != 'all':
+        params['visibility'] = filters['visibility']
+    cutoff = _pushed_cutoff(filters)
+    if cutoff is not None:
+        # `since` filters on updated_at, which a push always advances, so it is a
+        # safe superset; pushed_at is still checked locally
+        params['since'] = cutoff.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return params
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def repo_filter_reason(repo, filters, cutoff=None):
+    """Return why a repository is filtered out, or None if it passes"""
+    if filters['skip_forks'] and repo.get('fork', False):
+        return "fork"
+    if filters['skip_archived'] and repo.get('archived', False):
+        return "archived"
+    if filters['visibility'] == 'public' and repo.get('private', False):
+        return "private"
+    if filters['visibility'] == 'private' and not repo.get('private', False):
+        return "public"
+    if cutoff is not None:
+        pushed = _parse_timestamp(repo.get('pushed_at'))
+        if pushed is None or pushed < cutoff:
+            return "stale"
+    stars = repo.get('stargazers_count') or 0
+    if filters['min_stars'] is not None and stars < filters['min_stars']:
+        return "stars"
+    language = repo.get('language')
+    if filters['languages'] and language not in filters['languages']:
+        return "language"
+    if language and language in filters['exclude_languages']:
+        return "language"
+    size = repo.get('size') or 0
+    if filters['min_size'] is not None and size < filters['min_size']:
+        return "size"
+    if filters['max_size'] is not None and size > filters['max_size']:
+        return "size"
+    return None
+
+
+def filter_repos(repos, filters):
+    """Split repositories into those that pass the filters and a Counter of skip reasons"""
+    cutoff = _pushed_cutoff(filters)
+    kept = []
+    reasons = Counter()
+    for repo in repos:
+        reason = repo_filter_reason(repo, filters, cutoff)
+        if reason is None:
+            kept.append(repo)
+        else:
+            reasons[reason] += 1
+    return kept, reasons
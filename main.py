@@ -1,51 +1,234 @@
 import requests
 import os
-import base64
+import codecs
+from urllib.parse import urlparse, parse_qs
+from metrics import metrics
+from concurrency import map_ahead
 
-def get_github_username():
+def _api_url(path):
+    """Full GitHub API URL; GITHUB_API_URL overrides the host (benchmarks, GitHub Enterprise)"""
+    return os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/') + path
+
+def _auth_headers(token=None):
+    """Authorization headers for the given token (defaults to GITHUB_TOKEN)"""
+    return {"Authorization": f"token {token or os.getenv('GITHUB_TOKEN')}"}
+
+def _github_get(url, token=None, session=None, accept=None, **kwargs):
+    """GET a GitHub API URL, counting the request in the run metrics"""
+    http = session or requests
+    headers = _auth_headers(token)
+    if accept:
+        headers["Accept"] = accept
+    metrics.incr('http_requests')
+    return http.get(url, headers=headers, **kwargs)
+
+def _readme_max_bytes():
+    """Byte cap for README downloads (PORTFOLIO_README_MAX_BYTES, default 512 KB)"""
+    return int(os.getenv('PORTFOLIO_README_MAX_BYTES', 512 * 1024))
+
+def _declared_charset(response):
+    """Charset explicitly declared in the Content-Type header, if any"""
+    for param in response.headers.get('Content-Type', '').split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"\' ')
+    return None
+
+def _fallback_decoder(declared, head):
+    """Incremental decoder to use once UTF-8 has failed"""
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return codecs.getincrementaldecoder('utf-16')(errors='replace')
+    if declared:
+        try:
+            if codecs.lookup(declared).name != 'utf-8':
+                return codecs.getincrementaldecoder(declared)(errors='replace')
+        except LookupError:
+            pass
+    # Windows-1252 is a superset of Latin-1 for printable text and the usual culprit
+    return codecs.getincrementaldecoder('cp1252')(errors='replace')
+
+def _switch_to_fallback(response, head, parts, pending, final=False):
+    """Re-decode everything seen so far with the fallback charset after UTF-8 failed"""
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        # Nothing decoded as UTF-8 is valid; restart from the first byte
+        consumed = b''
+    else:
+        # Re-encode what decoded cleanly so the fallback sees the exact bytes
+        consumed = ''.join(parts).encode('utf-8')
+    decoder = _fallback_decoder(_declared_charset(response), head)
+    return decoder, [decoder.decode(consumed + pending, final=final)]
+
+def _decode_readme_stream(response, max_bytes, chunk_size=16 * 1024):
+    """Decode a streamed README body incrementally, stopping after `max_bytes`.
+    Tries UTF-8 (BOM-aware) first and falls back to the declared charset or cp1252.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    parts = []
+    received = 0
+    truncated = False
+    head = b''
+    
+    def feed(chunk):
+        nonlocal decoder, parts
+        buffered = decoder.getstate()[0]
+        try:
+            parts.append(decoder.decode(chunk))
+        except UnicodeDecodeError:
+            decoder, parts = _switch_to_fallback(response, head, parts, buffered + chunk)
+    
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        if received + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - received]
+            truncated = True
+        received += len(chunk)
+        if len(head) < 4:
+            # Hold the first bytes back until a byte order mark can be recognised
+            head += chunk
+            if len(head) < 4 and not truncated:
+                continue
+            chunk = head
+        feed(chunk)
+        if truncated:
+            break
+    
+    if 0 < len(head) < 4 and not truncated:
+        # Bodies shorter than a BOM were held back entirely
+        feed(head)
+    if not truncated:
+        buffered = decoder.getstate()[0]
+        try:
+            parts.append(decoder.decode(b'', final=True))
+        except UnicodeDecodeError:
+            decoder, parts = _switch_to_fallback(response, head, parts, buffered, final=True)
+    
+    metrics.incr('readme_bytes', received)
+    text = ''.join(parts)
+    if truncated:
+        metrics.incr('readme_truncated')
+        text += f"\n\n[README truncated at {max_bytes // 1024} KB]"
+    return text
+
+def get_github_username(token=None, session=None):
     """Get the authenticated user's GitHub username"""
-    headers = {"Authorization": f"token {os.getenv('GITHUB_TOKEN')}"}
-    response = requests.get("https://api.github.com/user", headers=headers)
+    response = _github_get(_api_url("/user"), token, session)
     if response.status_code == 200:
         return response.json()['login']
     else:
         raise Exception(f"Failed to get user info: {response.status_code}")
 
-def get_user_repos():
-    """Get all repositories for the authenticated user with pagination support"""
-    headers = {"Authorization": f"token {os.getenv('GITHUB_TOKEN')}"}
+class RepoInfo:
+    """Compact projection of a GitHub repository listing entry.
+    Keeps only the fields the pipeline reads (the API returns 100+ per repo) and
+    supports dict-style access by GitHub field name, so filters and the
+    checkpoint journal work on either form.
+    """
+    __slots__ = ('name', 'full_name', 'owner_login', 'description', 'language', 'stargazers_count',
+                 'forks_count', 'private', 'fork', 'archived', 'size', 'pushed_at', 'updated_at')
+    
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            setattr(self, field, fields.get(field))
+    
+    @classmethod
+    def from_api(cls, data):
+        fields = {field: data.get(field) for field in cls.__slots__}
+        fields['owner_login'] = data.get('owner_login') or (data.get('owner') or {}).get('login')
+        return cls(**fields)
+    
+    def to_dict(self):
+        """GitHub-shaped dict (for JSON), restorable with from_api"""
+        data = {field: getattr(self, field) for field in self.__slots__ if field != 'owner_login'}
+        data['owner'] = {'login': self.owner_login}
+        return data
+    
+    def get(self, key, default=None):
+        if key == 'owner':
+            return {'login': self.owner_login}
+        if key in self.__slots__:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+    
+    def __getitem__(self, key):
+        if key != 'owner' and key not in self.__slots__:
+            raise KeyError(key)
+        return self.get(key)
+    
+    def __repr__(self):
+        return f"RepoInfo({self.full_name or self.name!r})"
+
+@metrics.timed('get_user_repos')
+def get_user_repos(params=None, token=None, username=None, session=None, compact=False):
+    """Get all repositories for the authenticated user with pagination support.
+    Extra `params` (e.g. visibility, since) are passed through to the listing query.
+    With `username`, lists that user's public repositories instead.
+    With `compact`, each page is projected to RepoInfo objects as it arrives.
+    """
     all_repos = []
     page = 1
     per_page = 100  # Maximum allowed by GitHub API
     
     while True:
-        url = f"https://api.github.com/user/repos?page={page}&per_page={per_page}&sort=updated"
-        response = requests.get(url, headers=headers)
+        if username:
+            url = _api_url(f"/users/{username}/repos?page={page}&per_page={per_page}&sort=updated")
+        else:
+            url = _api_url(f"/user/repos?page={page}&per_page={per_page}&sort=updated")
+        with metrics.span('github.list_page'):
+            response = _github_get(url, token, session, params=params)
         
         if response.status_code == 200:
             repos = response.json()
             if not repos:  # No more repositories
                 break
-            all_repos.extend(repos)
+            all_repos.extend(map(RepoInfo.from_api, repos) if compact else repos)
             page += 1
         else:
             raise Exception(f"Failed to get repositories: {response.status_code}")
     
     return all_repos
 
-def fetch_readme(repo_name, username=None):
+def count_user_repos(params=None, token=None, session=None):
+    """Count the authenticated user's repositories without downloading the listing.
+    With per_page=1 the page number of the Link header's rel="last" URL is the count.
+    """
+    response = _github_get(_api_url("/user/repos"), token, session, params={**(params or {}), 'per_page': 1})
+    if response.status_code != 200:
+        raise Exception(f"Failed to count repositories: {response.status_code}")
+    last = response.links.get('last')
+    if last is None:  # everything fits on the first page
+        return len(response.json())
+    return int(parse_qs(urlparse(last['url']).query)['page'][0])
+
+@metrics.timed('fetch_readme')
+def fetch_readme(repo_name, username=None, token=None, session=None):
     """Fetch README content for a specific repository"""
     if username is None:
-        username = get_github_username()
+        username = get_github_username(token, session)
     
-    headers = {"Authorization": f"token {os.getenv('GITHUB_TOKEN')}"}
-    url = f'https://api.github.com/repos/{username}/{repo_name}/readme'
-    response = requests.get(url, headers=headers)
+    url = _api_url(f'/repos/{username}/{repo_name}/readme')
+    # The raw media type streams the file itself instead of a base64 JSON blob
+    response = _github_get(url, token, session, accept='application/vnd.github.raw', stream=True)
     
+    with response:
+        if response.status_code == 200:
+            return _decode_readme_stream(response, _readme_max_bytes())
+        elif response.status_code == 404:
+            return "No README found"
+        else:
+            return f"Error fetching README: {response.status_code}"
+
+@metrics.timed('fetch_repo_languages')
+def fetch_repo_languages(repo_name, username=None, token=None, session=None):
+    """Bytes of code per language for a repository, or None if the request fails"""
+    if username is None:
+        username = get_github_username(token, session)
+    response = _github_get(_api_url(f'/repos/{username}/{repo_name}/languages'), token, session)
     if response.status_code == 200:
-        content = response.json()['content']
-        return base64.b64decode(content).decode('utf-8')
-    elif response.status_code == 404:
-        return "No README found"
-    else:
-        return f"Error fetching README: {response.status_code}"
\ No newline at end of file
+        return response.json()
+    return None
+
+def prefetch_readmes(repos, fetch, lookahead=8):
+    """Yield (repo, readme) pairs in order while fetching up to `lookahead` READMEs ahead in the background"""
+    return map_ahead(fetch, repos, lookahead)
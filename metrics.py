@@ -0,0 +1,125 @@
+"""
+Lightweight run instrumentation: timing spans and counters.
+
+Use the module-level `metrics` registry:
+
+    with metrics.span('fetch_readme'):
+        ...
+    metrics.incr('http_requests')
+
+`metrics.summary()` reports count/total/p50/p95/max per span name, all
+counters and the process's peak RSS; `write_json` and `print_profile` back run.py's --metrics-json and
+--profile flags.
+"""
+
+import sys
+import json
+import time
+import threading
+import functools
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class Metrics:
+    """Thread-safe collection of span durations and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.durations = defaultdict(list)
+            self.counters = Counter()
+            self.started = time.time()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator recording every call of the wrapped function as a span"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self.durations[name].append(seconds)
+
+    def incr(self, name, amount=1):
+        if amount:
+            with self._lock:
+                self.counters[name] += amount
+
+    def summary(self):
+        with self._lock:
+            stages = {}
+            for name, values in self.durations.items():
+                ordered = sorted(values)
+                stages[name] = {
+                    'count': len(ordered),
+                    'total_s': round(sum(ordered), 4),
+                    'p50_s': round(percentile(ordered, 50), 4),
+                    'p95_s': round(percentile(ordered, 95), 4),
+                    'max_s': round(ordered[-1], 4),
+                }
+            return {
+                'wall_time_s': round(time.time() - self.started, 3),
+                'peak_rss_mb': peak_rss_mb(),
+                'stages': stages,
+                'counters': dict(self.counters),
+            }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+
+    def print_profile(self):
+        data = self.summary()
+        print('\n' + '=' * 70)
+        peak = f', peak RSS {data["peak_rss_mb"]:.1f} MB' if data['peak_rss_mb'] is not None else ''
+        print(f'⏱️  PROFILE (wall time {data["wall_time_s"]:.2f}s{peak})')
+        print(f'{"stage":<28}{"count":>7}{"total":>10}{"p50":>9}{"p95":>9}{"max":>9}')
+        for name, stage in sorted(data['stages'].items(), key=lambda item: -item[1]['total_s']):
+            print(f'{name:<28}{stage["count"]:>7}{stage["total_s"]:>9.2f}s'
+                  f'{stage["p50_s"]:>8.3f}s{stage["p95_s"]:>8.3f}s{stage["max_s"]:>8.3f}s')
+        if data['counters']:
+            print('-' * 70)
+            for name, value in sorted(data['counters'].items()):
+                print(f'{name:<28}{value:>10}')
+        print('=' * 70)
+
+
+metrics = Metrics()
@@ -0,0 +1,230 @@
+"""
+Multi-format output engine.
+
+The collected projects are parsed once into a shared document
+(document.build_document) and every requested format is rendered from it
+concurrently:
+
+    write_outputs(projects, user_name, formats=['pdf', 'html', 'md', 'json'])
+"""
+
+import os
+import json
+import html
+from concurrent.futures import ThreadPoolExecutor
+
+from document import build_document, OVERVIEW_TITLE, overview_figures, format_bytes
+from metrics import metrics
+from process import render_pdf
+
+DEFAULT_BASENAME = 'GitHub_Portfolio'
+
+HTML_STYLE = """
+body { font-family: Arial, Helvetica, sans-serif; max-width: 820px; margin: 0 auto; padding: 24px; color: #000; }
+header.cover { text-align: center; padding: 48px 0; border-bottom: 1px solid #ddd; }
+header.cover h1 { color: rgb(44, 62, 80); font-size: 2.4em; margin-bottom: 0.2em; }
+header.cover .subtitle { color: rgb(52, 73, 94); font-style: italic; font-size: 1.3em; }
+header.cover .prepared { color: rgb(39, 174, 96); font-weight: bold; font-size: 1.4em; margin-top: 1em; }
+header.cover .meta { color: rgb(128, 128, 128); }
+header.cover .count { color: rgb(44, 62, 80); font-weight: bold; }
+article { padding: 24px 0; border-bottom: 1px solid #eee; }
+article .number { color: rgb(231, 76, 60); font-weight: bold; font-size: 1.6em; margin: 0; }
+article h2 { color: rgb(44, 62, 80); font-size: 1.5em; margin: 0.2em 0 0.4em; padding-bottom: 6px; border-bottom: 3px solid rgb(52, 152, 219); }
+article h3 { color: rgb(44, 62, 80); font-size: 1.1em; margin: 1em 0 0.3em; }
+article li { color: rgb(52, 73, 94); }
+section.overview { padding: 24px 0; border-bottom: 1px solid #eee; }
+section.overview h2 { color: rgb(44, 62, 80); font-size: 1.5em; padding-bottom: 6px; border-bottom: 3px solid rgb(52, 152, 219); }
+section.overview h3 { color: rgb(44, 62, 80); font-size: 1.1em; margin: 1em 0 0.3em; }
+section.overview dt { font-weight: bold; color: rgb(44, 62, 80); float: left; width: 12em; }
+section.overview td { padding: 2px 8px 2px 0; color: rgb(52, 73, 94); }
+section.overview .bar { display: inline-block; height: 0.7em; background: rgb(52, 152, 219); }
+"""
+
+
+def _html_overview(stats):
+    esc = html.escape
+    parts = ['<section class="overview">', f"<h2>{esc(OVERVIEW_TITLE)}</h2>", '<dl>']
+    parts += [f"<dt>{esc(label)}</dt><dd>{esc(value)}</dd>" for label, value in overview_figures(stats)]
+    parts.append('</dl>')
+    tables = [
+        ('Languages', [(lang['name'], lang['share'], f"{lang['repos']} repos ({lang['share']:.0%})") for lang in stats['languages']]),
+        ('Code by Language', [(lang['name'], lang['share'], f"{format_bytes(lang['bytes'])} ({lang['share']:.0%})") for lang in stats['language_bytes']]),
+    ]
+    for title, rows in tables:
+        if not rows:
+            continue
+        parts += [f"<h3>{title}</h3>", '<table>']
+        parts += [f"<tr><td>{esc(label)}</td><td><span class=\"bar\" style=\"width: {share * 300:.0f}px\"></span></td><td>{esc(value)}</td></tr>"
+                  for label, share, value in rows]
+        parts.append('</table>')
+    lists = [
+        ('Most Starred', [f"{repo['name']} - {repo['stars']:,} stars" for repo in stats['most_starred']]),
+        ('Recently Updated', [f"{repo['name']} - {repo['updated']}" for repo in stats['recently_updated']]),
+    ]
+    for title, lines in lists:
+        if lines:
+            parts += [f"<h3>{title}</h3>", '<ul>'] + [f"<li>{esc(line)}</li>" for line in lines] + ['</ul>']
+    parts.append('</section>')
+    return parts
+
+
+def render_html(document, output_path):
+    """Render the document as a self-contained static HTML page"""
+    esc = html.escape
+    parts = [
+        '<!DOCTYPE html>',
+        '<html lang="en">',
+        '<head>',
+        '<meta charset="utf-8">',
+        f"<title>{esc(document['title'])}{' - ' + esc(document['user_name']) if document['user_name'] else ''}</title>",
+        f'<style>{HTML_STYLE}</style>',
+        '</head>',
+        '<body>',
+        '<header class="cover">',
+        f"<h1>{esc(document['title'])}</h1>",
+        f"<p class=\"subtitle\">{esc(document['subtitle'])}</p>",
+    ]
+    if document['user_name']:
+        parts.append(f"<p class=\"prepared\">Prepared for: {esc(document['user_name'])}</p>")
+    parts.append(f"<p class=\"meta\">Generated on {esc(document['generated_on'])}</p>")
+    parts.append(f"<p class=\"count\">Featuring {len(document['projects'])} Projects</p>")
+    parts.append('</header>')
+    if document.get('stats'):
+        parts += _html_overview(document['stats'])
+
+    for project in document['projects']:
+        parts.append(f"<article id=\"project-{project['number']}\">")
+        parts.append(f"<p class=\"number\">Project {project['number']}</p>")
+        parts.append(f"<h2>{esc(project['title'])}</h2>")
+        for section in project['sections']:
+            if section['heading']:
+                parts.append(f"<h3>{esc(section['heading'])}</h3>")
+            in_list = False
+            for block in section['blocks']:
+                if block['type'] == 'bullet' and not in_list:
+                    parts.append('<ul>')
+                    in_list = True
+                elif block['type'] != 'bullet' and in_list:
+                    parts.append('</ul>')
+                    in_list = False
+                tag = 'li' if block['type'] == 'bullet' else 'p'
+                parts.append(f"<{tag}>{esc(block['text'])}</{tag}>")
+            if in_list:
+                parts.append('</ul>')
+        parts.append('</article>')
+    parts.extend(['</body>', '</html>', ''])
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+    return True
+
+
+def _markdown_overview(stats):
+    lines = ['---', '', f"## {OVERVIEW_TITLE}", '']
+    lines += [f"- **{label}:** {value}" for label, value in overview_figures(stats)] + ['']
+    if stats['languages']:
+        lines += ['### Languages', '', '| Language | Repositories | Share |', '| --- | ---: | ---: |']
+        lines += [f"| {lang['name']} | {lang['repos']} | {lang['share']:.0%} |" for lang in stats['languages']] + ['']
+    if stats['language_bytes']:
+        lines += ['### Code by Language', '', '| Language | Size | Share |', '| --- | ---: | ---: |']
+        lines += [f"| {lang['name']} | {format_bytes(lang['bytes'])} | {lang['share']:.0%} |" for lang in stats['language_bytes']] + ['']
+    if stats['most_starred']:
+        lines += ['### Most Starred', ''] + [f"- {repo['name']} - {repo['stars']:,} stars" for repo in stats['most_starred']] + ['']
+    if stats['recently_updated']:
+        lines += ['### Recently Updated', ''] + [f"- {repo['name']} - {repo['updated']}" for repo in stats['recently_updated']] + ['']
+    return lines
+
+
+def render_markdown(document, output_path):
+    """Render the document as Markdown"""
+    lines = [f"# {document['title']}", '', f"*{document['subtitle']}*", '']
+    if document['user_name']:
+        lines += [f"**Prepared for:** {document['user_name']}", '']
+    lines += [f"Generated on {document['generated_on']} - Featuring {len(document['projects'])} Projects", '']
+    if document.get('stats'):
+        lines += _markdown_overview(document['stats'])
+
+    for project in document['projects']:
+        lines += ['---', '', f"## Project {project['number']}: {project['title']}", '']
+        for section in project['sections']:
+            if section['heading']:
+                lines += [f"### {section['heading'].rstrip(':')}", '']
+            previous = None
+            for block in section['blocks']:
+                if block['type'] == 'bullet':
+                    lines.append(f"- {block['text']}")
+                else:
+                    if previous == 'bullet':
+                        lines.append('')
+                    lines += [block['text'], '']
+                previous = block['type']
+            if previous == 'bullet':
+                lines.append('')
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return True
+
+
+def render_json(document, output_path):
+    """Write the parsed document itself as JSON"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return True
+
+
+# format name -> (file extension, renderer)
+RENDERERS = {
+    'pdf': ('pdf', render_pdf),
+    'html': ('html', render_html),
+    'md': ('md', render_markdown),
+    'json': ('json', render_json),
+}
+
+
+def parse_formats(value):
+    """Parse a comma-separated format list such as 'pdf,html' (or 'all')"""
+    formats = [fmt.strip().lower() for fmt in value.split(',') if fmt.strip()]
+    if formats == ['all']:
+        return list(RENDERERS)
+    unknown = [fmt for fmt in formats if fmt not in RENDERERS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s): {', '.join(unknown)} (expected {', '.join(RENDERERS)} or all)")
+    return list(dict.fromkeys(formats)) or ['pdf']
+
+
+def _render(fmt, document, output_path):
+    extension, renderer = RENDERERS[fmt]
+    with metrics.span(f'render.{fmt}'):
+        ok = renderer(document, output_path)
+    if ok and fmt != 'pdf':  # render_pdf counts its own bytes
+        metrics.incr('bytes_written', os.path.getsize(output_path))
+    return ok
+
+
+@metrics.timed('write_outputs')
+def write_outputs(projects, user_name=None, formats=('pdf',), basename=DEFAULT_BASENAME, stats=None):
+    """Render `projects` into every requested format from one shared document.
+    `stats` (stats.RepoStats.to_dict()) adds an overview section to every format.
+    Returns {format: output path} for the formats that were written successfully.
+    """
+    document = build_document(projects, user_name, stats=stats)
+    directory = os.path.dirname(basename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    paths = {fmt: f"{basename}.{RENDERERS[fmt][0]}" for fmt in formats}
+
+    written = {}
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        futures = {fmt: executor.submit(_render, fmt, document, path) for fmt, path in paths.items()}
+        for fmt, future in futures.items():
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"Error generating {fmt.upper()}: {str(e)}")
+                ok = False
+            if ok:
+                written[fmt] = paths[fmt]
+                if fmt != 'pdf':
+                    print(f"✨ {fmt.upper()} portfolio generated successfully: {paths[fmt]}")
+    return written
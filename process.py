@@ -1,8 +1,19 @@
 import anthropic
 import os
+import io
+import time
+import threading
 from main import fetch_readme, get_user_repos
-from fpdf import FPDF
+from fpdf import FPDF, FPDF_VERSION
+try:
+    from fpdf.fonts import TTFFont
+except ImportError:
+    # Older fpdf2 releases keep their font classes elsewhere; fonts are then parsed per document
+    TTFFont = None
 import re
+from metrics import metrics
+from theme import load_theme
+from document import build_document, document_text, parse_summary, SummaryParser, OVERVIEW_TITLE, overview_figures, format_bytes
 
 def clean_text_for_pdf(text):
     """Clean text to be compatible with PDF encoding"""
@@ -20,9 +31,25 @@ def clean_text_for_pdf(text):
     
     return text
 
+def normalize_summary_text(text):
+    """Light normalisation for summaries that keeps non-ASCII text intact"""
+    return text.replace('\r\n', '\n').replace('•', '* ')
+
+def prepare_pdf_text(pdf, text):
+    """Text ready for the PDF's fonts: glyphs the Unicode font lacks (e.g. emoji) are dropped,
+    and without a Unicode font the lossy ASCII clean-up applies.
+    """
+    text = str(text)
+    if not getattr(pdf, 'unicode_font', False):
+        return clean_text_for_pdf(text)
+    coverage = getattr(pdf, 'glyph_coverage', None)
+    if text.isascii() or coverage is None:
+        return text
+    return ''.join(ch for ch in text if ord(ch) in coverage or ch.isspace())
+
 def truncate_text_to_fit(pdf, text, cell_width, font_family=None, font_style=None, font_size=None):
     """Truncate text with ellipsis to fit in the given cell width for the current font settings."""
-    cleaned = clean_text_for_pdf(text)
+    cleaned = prepare_pdf_text(pdf, text)
     if cell_width == 0:
         # 0 means extend up to the right margin, so we use the current page width minus margins
         cell_width = pdf.w - pdf.r_margin - pdf.x
@@ -41,13 +68,421 @@ def truncate_text_to_fit(pdf, text, cell_width, font_family=None, font_style=Non
     # If even one char + ellipsis doesn't fit, return ellipsis only
     return ellipsis
 
-def summarize_project(readme, code_snippets=""):
-    """Summarize a project for portfolio using Anthropic Claude.
-    If PORTFOLIO_NO_LLM=true, generate a heuristic summary from README without API calls.
+# Bundled DejaVu Sans covers Latin, Greek, Cyrillic and many symbols. Point
+# PORTFOLIO_FONT / PORTFOLIO_FONT_BOLD / PORTFOLIO_FONT_ITALIC at other TTFs.
+# Other scripts come from fallback fonts: PORTFOLIO_FALLBACK_FONTS (os.pathsep-separated)
+# if set, otherwise any font in fonts/fallback/ plus the first CJK font found on the system.
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+FALLBACK_FONT_DIR = os.path.join(FONT_DIR, 'fallback')
+SYSTEM_CJK_FONTS = [
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',
+    '/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf',
+    '/System/Library/Fonts/Supplemental/Arial Unicode.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+    '/System/Library/Fonts/Hiragino Sans GB.ttc',
+    'C:\\Windows\\Fonts\\msyh.ttc',
+    'C:\\Windows\\Fonts\\simsun.ttc',
+]
+UNICODE_FONT_FAMILY = 'PortfolioSans'
+UNICODE_FONT_FILES = {
+    '': ('PORTFOLIO_FONT', 'DejaVuSans.ttf'),
+    'B': ('PORTFOLIO_FONT_BOLD', 'DejaVuSans-Bold.ttf'),
+    'I': ('PORTFOLIO_FONT_ITALIC', 'DejaVuSans-Oblique.ttf'),
+}
+
+_font_cache = {}
+_font_cache_lock = threading.Lock()
+_font_cache_warned = False
+
+def ascii_pdf_requested():
+    """True when the lossy ASCII-only PDF path was requested (PORTFOLIO_ASCII_PDF)"""
+    return str(os.getenv("PORTFOLIO_ASCII_PDF", "")).lower() in ("1", "true", "yes")
+
+def unicode_font_paths():
+    """Map PDF style -> TTF path for the Unicode font, or None if a file is missing"""
+    paths = {}
+    for style, (env_var, filename) in UNICODE_FONT_FILES.items():
+        path = os.getenv(env_var) or os.path.join(FONT_DIR, filename)
+        if not os.path.exists(path):
+            return None
+        paths[style] = path
+    return paths
+
+def _fallback_font_paths():
+    """Fallback font files: PORTFOLIO_FALLBACK_FONTS if set (empty disables them), otherwise discovered"""
+    value = os.getenv('PORTFOLIO_FALLBACK_FONTS')
+    if value is not None:
+        return [path for path in value.split(os.pathsep) if path and os.path.exists(path)]
+    paths = []
+    if os.path.isdir(FALLBACK_FONT_DIR):
+        paths = [os.path.join(FALLBACK_FONT_DIR, name) for name in sorted(os.listdir(FALLBACK_FONT_DIR))
+                 if name.lower().endswith(('.ttf', '.otf', '.ttc'))]
+    system = next((path for path in SYSTEM_CJK_FONTS if os.path.exists(path)), None)
+    if system:
+        paths.append(system)
+    return paths
+
+def missing_glyphs(texts, coverage):
+    """Sorted characters in `texts` that have no glyph in `coverage` (whitespace aside)"""
+    chars = set()
+    for text in texts:
+        if text and not text.isascii():
+            chars.update(text)
+    return sorted(ch for ch in chars if ord(ch) not in coverage and not ch.isspace())
+
+def describe_missing_glyphs(chars, limit=12):
+    shown = ' '.join(chars[:limit]) + (' ...' if len(chars) > limit else '')
+    return (f"The PDF fonts have no glyphs for {len(chars)} character{'s' if len(chars) != 1 else ''} ({shown}); "
+            f"they are left out of the PDF. Install a font that covers them (e.g. Noto Sans CJK), copy it "
+            f"into fonts/fallback/ or point PORTFOLIO_FALLBACK_FONTS at it.")
+
+def unsupported_characters(texts, ascii_only=None):
+    """Characters in `texts` that a PDF rendered now would drop, even with every fallback font"""
+    if ascii_only is None:
+        ascii_only = ascii_pdf_requested()
+    if ascii_only:
+        # The ASCII path reduces text on purpose
+        return []
+    pdf = FPDF()
+    if add_unicode_fonts(pdf) is None:
+        return []
+    return missing_glyphs(texts, pdf.glyph_coverage)
+
+class _PrefixWidthTTFFont(TTFFont or object):
+    """TTFFont that extends its previous width measurement when the text has only grown.
+    fpdf2's line breaker re-measures the whole line after every character it adds, so
+    without this multi_cell is quadratic in the line length.
+    """
+    __slots__ = ('_measured',)
+
+    def get_text_width(self, text, font_size_pt, text_shaping_params):
+        if text_shaping_params or self.is_symbol:
+            return super().get_text_width(text, font_size_pt, text_shaping_params)
+        if font_size_pt > self.biggest_size_pt:
+            self.biggest_size_pt = font_size_pt
+        cw = self.cw
+        if len(text) == 1:
+            # Single characters are measured in between the growing line; keep the line cached
+            return 1, cw[ord(text)] * font_size_pt * 0.001
+        prefix, units = self._measured
+        if not text.startswith(prefix):
+            prefix, units = '', 0
+        for ch in text[len(prefix):]:
+            units += cw[ord(ch)]
+        self._measured = (text, units)
+        return len(text), units * font_size_pt * 0.001
+
+def _document_font(template, data, index):
+    """Per-document copy of a parsed font: shared metrics, fresh lazily-loaded tables and subset"""
+    from fontTools import ttLib
+    from fpdf.fonts import SubsetMap
+    font = _PrefixWidthTTFFont.__new__(_PrefixWidthTTFFont)
+    for slot in TTFFont.__slots__:
+        if hasattr(template, slot):
+            setattr(font, slot, getattr(template, slot))
+    font._measured = ('', 0)
+    font.i = index
+    font.ttfont = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, lazy=True,
+                               fontNumber=template.collection_font_number)
+    font._hbfont = None
+    font.biggest_size_pt = 0
+    font.missing_glyphs = []
+    font.subset = SubsetMap(font)
+    return font
+
+def _font_cache_fallback(reason):
+    """Count a font parsed afresh because the cache does not work with this fpdf2; warn once"""
+    global _font_cache_warned
+    metrics.incr('pdf_font_cache_fallback')
+    with _font_cache_lock:
+        warned, _font_cache_warned = _font_cache_warned, True
+    if not warned:
+        print(f"⚠️ Font cache unavailable with fpdf2 {FPDF_VERSION} ({reason}); "
+              "fonts are parsed for every PDF. Install the fpdf2 version from requirements.txt.")
+
+def _add_cached_font(pdf, family, style, path):
+    """Add a TTF to `pdf`, parsing each font file only once per process.
+    fpdf2 subsets a font's fontTools object in place when writing, so every document,
+    the first one included, gets a copy of the parsed metrics with its own font tables.
+    """
+    fontkey = f"{family.lower()}{style}"
+    if TTFFont is None:
+        _font_cache_fallback("fpdf.fonts.TTFFont is missing")
+        pdf.add_font(family, style, path)
+        return
+    with _font_cache_lock:
+        cached = _font_cache.get((path, style))
+    if cached is None:
+        with metrics.span('pdf.font_parse'):
+            with open(path, 'rb') as f:
+                data = f.read()
+            pdf.add_font(family, style, path)
+            template = pdf.fonts.pop(fontkey)
+        with _font_cache_lock:
+            _font_cache[(path, style)] = cached = (template, data)
+    else:
+        metrics.incr('font_cache_hits')
+    
+    template, data = cached
+    try:
+        pdf.fonts[fontkey] = _document_font(template, data, len(pdf.fonts) + 1)
+        if template.is_cff and template.is_cid_keyed:
+            # add_font raises the PDF version for CID-keyed CFF fonts (e.g. Noto CJK)
+            pdf._set_min_pdf_version("1.6")
+    except (AttributeError, TypeError, ImportError) as e:
+        # The copy relies on fpdf2 2.8.9 internals (see requirements.txt); a fresh parse is always correct
+        _font_cache_fallback(f"{type(e).__name__}: {e}")
+        pdf.fonts.pop(fontkey, None)
+        pdf.add_font(family, style, path)
+
+def add_unicode_fonts(pdf, texts=None):
+    """Register the Unicode TTF family on `pdf`. Returns the family name, or None if unavailable.
+    Fallback fonts are only registered when `texts` (default: assume so) need glyphs the main
+    font lacks: with fallbacks set, fpdf2 checks every character of every line for them.
+    """
+    paths = unicode_font_paths()
+    if not paths:
+        return None
+    for style, path in paths.items():
+        _add_cached_font(pdf, UNICODE_FONT_FAMILY, style, path)
+    fallback_paths = _fallback_font_paths()
+    if fallback_paths and texts is not None:
+        coverage = set()
+        for font in pdf.fonts.values():
+            coverage.update(font.cmap)
+        if not missing_glyphs(texts, coverage):
+            fallback_paths = []
+    fallbacks = []
+    for i, path in enumerate(fallback_paths, 1):
+        family = f"{UNICODE_FONT_FAMILY}Fallback{i}"
+        for style in UNICODE_FONT_FILES:
+            _add_cached_font(pdf, family, style, path)
+        fallbacks.append(family)
+    if fallbacks:
+        pdf.set_fallback_fonts(fallbacks)
+    coverage = set()
+    for fontkey, font in pdf.fonts.items():
+        if fontkey.startswith(UNICODE_FONT_FAMILY.lower()):
+            coverage.update(font.cmap)
+    pdf.glyph_coverage = coverage
+    return UNICODE_FONT_FAMILY
+
+# Static instructions shared by every summary request. They go first, in the
+# system prompt, marked for prompt caching; only the README in the user message
+# changes between calls. The API only caches prefixes of at least 1024 tokens
+# (2048 on Haiku models); shorter ones are processed normally at no extra cost,
+# so the instructions are not padded to reach that size.
+SUMMARY_INSTRUCTIONS = """Create a professional portfolio summary for the project whose README (and sometimes a code sample) you are given. Format your response with exactly these four sections, in this order, each header on its own line:
+
+**Project Overview:**
+[Write a compelling 2-3 sentence description of what this project does and its main purpose]
+
+**Key Features:**
+* [List 3-5 main features or capabilities, each as a bullet point]
+* [Each feature should be concise but descriptive]
+* [Focus on the most impressive or unique aspects]
+
+**Technologies Used:**
+[List the main technologies, frameworks, languages, and tools used - keep it concise]
+
+**Impact & Benefits:**
+[1-2 sentences about the value this project provides or problems it solves]
+
+Keep the response professional, engaging, and formatted exactly as shown above with the section headers and bullet points.
+Avoid emoji and decorative Unicode symbols.
+Respond with the four sections only, with no preamble and no closing remarks."""
+
+# The sections every summary must contain, in order
+SUMMARY_SECTIONS = ('Project Overview:', 'Key Features:', 'Technologies Used:', 'Impact & Benefits:')
+# Streamed summaries are abandoned as soon as they drift past these limits
+MAX_PREAMBLE_CHARS = 80
+MAX_HEADING_CHARS = 60
+MAX_SECTION_CHARS = 1500
+# Fresh generations requested after a summary drifts from the format
+FORMAT_RETRIES = 2
+
+class SummaryFormatError(Exception):
+    """Raised when a summary does not follow the four-section format"""
+
+class SummaryValidator:
+    """Checks a summary against SUMMARY_SECTIONS while it streams in.
+    `feed` raises SummaryFormatError as soon as the text drifts (preamble, unknown or
+    out-of-order header, runaway section); `finish` checks completeness and returns
+    (text, sections) with sections in document.parse_summary's structure.
+    """
+
+    def __init__(self):
+        self.parser = SummaryParser()
+        self.chunks = []
+        self.length = 0
+
+    def feed(self, text):
+        text = normalize_summary_text(text)
+        self.chunks.append(text)
+        self.length += len(text)
+        sections = self.parser.feed(text)
+        for i, section in enumerate(sections):
+            if i >= len(SUMMARY_SECTIONS) or section['heading'] != SUMMARY_SECTIONS[i]:
+                if section['heading'] is None:
+                    raise SummaryFormatError("text before the first section header")
+                raise SummaryFormatError(f"unexpected section header '{section['heading']}'")
+        if self.parser.in_heading:
+            if len(self.parser.pending) > MAX_HEADING_CHARS:
+                raise SummaryFormatError("unterminated bold text")
+        elif not sections and self.parser.buffered > MAX_PREAMBLE_CHARS:
+            raise SummaryFormatError("text before the first section header")
+        elif self.parser.buffered > MAX_SECTION_CHARS:
+            raise SummaryFormatError(f"section '{sections[-1]['heading']}' runs past {MAX_SECTION_CHARS} characters")
+
+    def finish(self):
+        sections = self.parser.close()
+        self.feed('')  # re-check the tail that close() just parsed
+        headings = [section['heading'] for section in sections]
+        missing = [heading for heading in SUMMARY_SECTIONS if heading not in headings]
+        if missing:
+            raise SummaryFormatError(f"missing section(s): {', '.join(missing)}")
+        empty = [section['heading'] for section in sections if not section['blocks']]
+        if empty:
+            raise SummaryFormatError(f"empty section(s): {', '.join(empty)}")
+        return normalize_summary_text(''.join(self.chunks)), sections
+
+    def fallback(self):
+        """(text, sections) for everything fed so far, parsed without the format checks"""
+        text = normalize_summary_text(''.join(self.chunks))
+        return text, parse_summary(text)
+
+def summary_system_blocks():
+    """System prompt blocks for summary requests, with the static instructions marked cacheable"""
+    return [{"type": "text", "text": SUMMARY_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}]
+
+def summary_user_message(readme, code_snippets=""):
+    """The per-repository part of a summary request"""
+    message = f"README Content:\n{readme}"
+    if code_snippets:
+        message += f"\n\nSample Code:\n{code_snippets[:1000]}"
+    return message
+
+def record_llm_usage(usage):
+    """Add the token usage reported by the Messages API to the run metrics"""
+    if usage is None:
+        return
+    metrics.incr('llm_input_tokens', getattr(usage, "input_tokens", 0) or 0)
+    metrics.incr('llm_output_tokens', getattr(usage, "output_tokens", 0) or 0)
+    metrics.incr('llm_cache_write_tokens', getattr(usage, "cache_creation_input_tokens", 0) or 0)
+    metrics.incr('llm_cache_read_tokens', getattr(usage, "cache_read_input_tokens", 0) or 0)
+
+def describe_llm_usage(counters):
+    """One-line token usage report for the run summary, or None if no LLM calls were made"""
+    if not counters.get('llm_requests'):
+        return None
+    uncached = counters.get('llm_input_tokens', 0)
+    written = counters.get('llm_cache_write_tokens', 0)
+    read = counters.get('llm_cache_read_tokens', 0)
+    total = uncached + written + read
+    hit_rate = f" ({read / total:.0%} of input from cache)" if total else ""
+    return (f"{counters['llm_requests']} requests, input {total:,} tokens: {uncached:,} uncached, "
+            f"{written:,} cache writes, {read:,} cache reads{hit_rate}; output {counters.get('llm_output_tokens', 0):,}"
+            + (f"; {counters['llm_format_aborts']} off-format generations stopped early "
+               f"({counters.get('llm_discarded_chars', 0):,} chars discarded)" if counters.get('llm_format_aborts') else "")
+            + (f"; {counters['llm_format_fallbacks']} kept off-format after {FORMAT_RETRIES} retries"
+               if counters.get('llm_format_fallbacks') else ""))
+
+_anthropic_clients = {}
+_anthropic_clients_lock = threading.Lock()
+
+def get_anthropic_client(retry_in_sdk=True):
+    """Shared Anthropic client (one connection pool per process).
+    With retry_in_sdk=False the SDK's own retries are off, so an AdaptiveLimiter sees every 429/529.
+    """
+    key = (os.getenv('ANTHROPIC_API_KEY'), os.getenv('ANTHROPIC_BASE_URL'), retry_in_sdk)
+    with _anthropic_clients_lock:
+        client = _anthropic_clients.get(key)
+        if client is None:
+            options = {} if retry_in_sdk else {'max_retries': 0}
+            client = _anthropic_clients[key] = anthropic.Anthropic(api_key=key[0], **options)
+        return client
+
+def classify_llm_error(exc):
+    """'overload' for 429/529 responses, 'transient' for other retryable failures, else None.
+    Errors sent mid-stream arrive with status 200, so the error type in the body counts too.
     """
+    status = getattr(exc, 'status_code', None)
+    body = getattr(exc, 'body', None)
+    error_type = body.get('error', {}).get('type') if isinstance(body, dict) else None
+    if status in (429, 529) or error_type in ('rate_limit_error', 'overloaded_error'):
+        return 'overload'
+    if status in (500, 502, 503, 504) or error_type == 'api_error' or isinstance(exc, anthropic.APIConnectionError):
+        return 'transient'
+    return None
+
+def llm_retry_after(exc):
+    """Seconds from the Retry-After header of a rejected request, if present"""
+    response = getattr(exc, 'response', None)
     try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def stream_summary(client, readme, code_snippets="", fallback=False):
+    """Stream one summary, validating its sections as they arrive.
+    Returns (text, sections); raises SummaryFormatError as soon as the output drifts,
+    which closes the stream so the rest of the generation is never produced.
+    With fallback the whole generation is read and an off-format summary is returned
+    as parsed by document.parse_summary instead.
+    """
+    validator = SummaryValidator()
+    usage = None
+    started = time.perf_counter()
+    metrics.incr('llm_requests')
+    with client.messages.stream(
+        model=os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-latest"),
+        max_tokens=1000,
+        temperature=0.2,
+        system=summary_system_blocks(),
+        messages=[{"role": "user", "content": summary_user_message(readme, code_snippets)}],
+    ) as stream:
+        try:
+            for event in stream:
+                if event.type == 'message_start':
+                    usage = event.message.usage
+                elif event.type == 'message_delta' and usage is not None:
+                    usage.output_tokens = event.usage.output_tokens
+                elif event.type == 'text':
+                    if not validator.length:
+                        metrics.observe('llm.ttft', time.perf_counter() - started)
+                    try:
+                        validator.feed(event.text)
+                    except SummaryFormatError:
+                        if not fallback:
+                            raise
+            return validator.finish()
+        except SummaryFormatError:
+            if fallback:
+                metrics.incr('llm_format_fallbacks')
+                return validator.fallback()
+            metrics.incr('llm_format_aborts')
+            metrics.incr('llm_discarded_chars', validator.length)
+            raise
+        finally:
+            record_llm_usage(usage)
+
+@metrics.timed('summarize_project')
+def summarize_project_sections(readme, code_snippets="", no_llm=None, limiter=None):
+    """Summarize a project and return (summary, sections), sections as parsed by document.parse_summary.
+    LLM summaries are streamed and validated section by section; a generation that drifts from
+    the format is abandoned early and retried up to FORMAT_RETRIES times; the last attempt
+    keeps whatever comes back, parsed by document.parse_summary.
+    On failure returns ("Error generating summary: ...", None).
+    """
+    try:
+        if no_llm is None:
+            no_llm = str(os.getenv("PORTFOLIO_NO_LLM", "")).lower() in ("1", "true", "yes")
         # Heuristic/no-LLM mode for fast verification and zero-cost runs
-        if str(os.getenv("PORTFOLIO_NO_LLM", "")).lower() in ("1", "true", "yes"):  
+        if no_llm:
             overview = ""
             key_features = []
             technologies = []
@@ -100,186 +535,281 @@ def summarize_project(readme, code_snippets=""):
                 "**Impact & Benefits:**\n"
                 f"{impact}"
             )
-            return clean_text_for_pdf(summary)
+            summary = normalize_summary_text(summary)
+            return summary, parse_summary(summary)
 
         # Initialize Anthropic client only when needed
-        client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
-        
-        prompt = f"""
-        Create a professional portfolio summary for this project. Format your response with clear sections:
-
-        **Project Overview:**
-        [Write a compelling 2-3 sentence description of what this project does and its main purpose]
-
-        **Key Features:**
-        * [List 3-5 main features or capabilities, each as a bullet point]
-        * [Each feature should be concise but descriptive]
-        * [Focus on the most impressive or unique aspects]
-
-        **Technologies Used:**
-        [List the main technologies, frameworks, languages, and tools used - keep it concise]
-
-        **Impact & Benefits:**
-        [1-2 sentences about the value this project provides or problems it solves]
-
-        README Content:
-        {readme}
-
-        Sample Code:
-        {code_snippets[:1000]}
-
-        Keep the response professional, engaging, and formatted exactly as shown above with the section headers and bullet points.
-        Use only ASCII characters and avoid special Unicode symbols.
-        """
-        
-        response = client.messages.create(
-            model=os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-latest"),
-            max_tokens=1000,
-            temperature=0.2,
-            messages=[{"role": "user", "content": prompt}],
-        )
-
-        # Extract text from Anthropic response and clean for PDF compatibility
-        text = ""
-        try:
-            # response.content is a list of content blocks; take first text block
-            for block in response.content:
-                if getattr(block, "type", None) == "text" or hasattr(block, "text"):
-                    text += getattr(block, "text", str(block))
-            if not text and hasattr(response, "content"):  # fallback
-                text = str(response.content)
-        except Exception:
-            text = str(response)
-        return clean_text_for_pdf(text)
+        client = get_anthropic_client(retry_in_sdk=limiter is None)
+        for attempt in range(FORMAT_RETRIES + 1):
+            last = attempt == FORMAT_RETRIES
+            request = lambda: stream_summary(client, readme, code_snippets, fallback=last)
+            try:
+                if limiter is None:
+                    return request()
+                return limiter.call(request, classify=classify_llm_error, retry_after=llm_retry_after)
+            except SummaryFormatError:
+                metrics.incr('llm_format_retries')
     except Exception as e:
-        return f"Error generating summary: {str(e)}"
+        metrics.incr('llm_errors')
+        return f"Error generating summary: {str(e)}", None
 
-def generate_pdf(projects, user_name=None):
-    """Generate a beautifully formatted PDF portfolio, personalized with the user's name"""
-    try:
-        class PortfolioPDF(FPDF):
-            def header(self):
-                self.set_font('Arial', 'B', 20)
-                self.set_text_color(44, 62, 80)
-                safe_title = truncate_text_to_fit(self, 'GitHub Portfolio', 0, 'Arial', 'B', 20)
-                self.cell(0, 15, safe_title, 0, 1, 'C')
-                self.set_text_color(0, 0, 0)
-                self.ln(5)
-            def footer(self):
-                self.set_y(-15)
-                self.set_font('Arial', 'I', 8)
-                self.set_text_color(128, 128, 128)
-                page_str = f'Page {self.page_no()}'
-                safe_page = truncate_text_to_fit(self, page_str, 0, 'Arial', 'I', 8)
-                self.cell(0, 10, safe_page, 0, 0, 'C')
-                self.set_text_color(0, 0, 0)
-            def safe_cell(self, w, h, txt='', border=0, ln=0, align='', fill=False, font_family=None, font_style=None, font_size=None):
-                try:
-                    cleaned_txt = clean_text_for_pdf(str(txt))
-                    # Ensure there is enough horizontal space; if not, move to next line first
-                    min_char_width = self.get_string_width('W') + 0.5
-                    avail_width = (self.w - self.r_margin - self.x) if w == 0 else w
-                    if avail_width <= min_char_width:
-                        self.ln(h or 6)
-                    safe_txt = truncate_text_to_fit(self, cleaned_txt, w, font_family, font_style, font_size)
-                    try:
-                        self.cell(w, h, safe_txt, border, ln, align, fill)
-                    except Exception as e:
-                        if 'Not enough horizontal space' in str(e):
-                            # Try on a new line
-                            self.ln(h or 6)
-                            self.cell(w, h, safe_txt, border, ln, align, fill)
-                        else:
-                            raise
-                except Exception as e:
-                    self.cell(w, h, '[Text encoding error]', border, ln, align, fill)
-            def safe_multi_cell(self, w, h, txt, border=0, align='J', fill=False):
-                try:
-                    cleaned_txt = clean_text_for_pdf(str(txt))
-                    # Ensure enough horizontal space for at least one char; if not, new line first
-                    min_char_width = self.get_string_width('W') + 0.5
-                    avail_width = (self.w - self.r_margin - self.x) if w == 0 else w
-                    if avail_width <= min_char_width:
-                        self.ln(h or 6)
-                    try:
-                        self.multi_cell(w, h, cleaned_txt, border, align, fill)
-                    except Exception as e:
-                        if 'Not enough horizontal space' in str(e):
-                            # Force new line and retry once
-                            self.ln(h or 6)
-                            self.multi_cell(w, h, cleaned_txt, border, align, fill)
-                        else:
-                            raise
-                except Exception as e:
-                    self.multi_cell(w, h, '[Text encoding error]', border, align, fill)
-
-        pdf = PortfolioPDF()
-        pdf.set_auto_page_break(auto=True, margin=20)
-        pdf.add_page()
-        pdf.ln(30)
-        pdf.set_font('Arial', 'B', 28)
-        pdf.set_text_color(44, 62, 80)
-        pdf.safe_cell(0, 20, 'GitHub Portfolio', 0, 1, 'C', font_family='Arial', font_style='B', font_size=28)
-        pdf.set_font('Arial', 'I', 16)
-        pdf.set_text_color(52, 73, 94)
-        pdf.safe_cell(0, 15, 'Project Showcase & Technical Summary', 0, 1, 'C', font_family='Arial', font_style='I', font_size=16)
-        # Add user's name if provided
-        if user_name:
-            pdf.ln(10)
-            pdf.set_font('Arial', 'B', 18)
-            pdf.set_text_color(39, 174, 96)  # Green accent
-            pdf.safe_cell(0, 12, f'Prepared for: {user_name}', 0, 1, 'C', font_family='Arial', font_style='B', font_size=18)
-        from datetime import datetime
-        pdf.set_font('Arial', '', 12)
-        pdf.set_text_color(128, 128, 128)
-        pdf.ln(20)
-        pdf.safe_cell(0, 10, f'Generated on {datetime.now().strftime("%B %d, %Y")}', 0, 1, 'C', font_family='Arial', font_size=12)
-        pdf.set_font('Arial', 'B', 14)
-        pdf.set_text_color(44, 62, 80)
-        pdf.ln(10)
-        pdf.safe_cell(0, 10, f'Featuring {len(projects)} Projects', 0, 1, 'C', font_family='Arial', font_style='B', font_size=14)
-        pdf.set_text_color(0, 0, 0)
-        for i, project in enumerate(projects, 1):
-            pdf.add_page()
-            pdf.set_font('Arial', 'B', 24)
-            pdf.set_text_color(231, 76, 60)
-            pdf.safe_cell(0, 15, f"Project {i}", 0, 1, 'L', font_family='Arial', font_style='B', font_size=24)
-            pdf.set_font('Arial', 'B', 20)
-            pdf.set_text_color(44, 62, 80)
-            pdf.safe_cell(0, 12, project['title'], 0, 1, 'L', font_family='Arial', font_style='B', font_size=20)
-            pdf.set_fill_color(52, 152, 219)
-            pdf.rect(10, pdf.get_y(), 190, 1, 'F')
-            pdf.ln(8)
-            summary = clean_text_for_pdf(project['summary'])
-            sections = summary.split('**')
-            pdf.set_text_color(0, 0, 0)
-            for j, section in enumerate(sections):
-                if not section.strip():
-                    continue
-                if ':' in section and j % 2 == 1:
-                    pdf.set_font('Arial', 'B', 14)
-                    pdf.set_text_color(44, 62, 80)
-                    pdf.ln(3)
-                    pdf.safe_cell(0, 8, section.strip(), 0, 1, 'L', font_family='Arial', font_style='B', font_size=14)
-                    pdf.ln(2)
+def summarize_project(readme, code_snippets="", no_llm=None, limiter=None):
+    """Summarize a project for portfolio using Anthropic Claude.
+    If no_llm is set (or PORTFOLIO_NO_LLM=true), generate a heuristic summary from README without API calls.
+    With a concurrency.AdaptiveLimiter, the request waits for a slot and 429/529 responses are retried.
+    """
+    return summarize_project_sections(readme, code_snippets, no_llm=no_llm, limiter=limiter)[0]
+
+@metrics.timed('generate_pdf')
+def generate_pdf(projects, user_name=None, output_path="GitHub_Portfolio.pdf", stats=None):
+    """Generate a beautifully formatted PDF portfolio, personalized with the user's name.
+    With `stats` (stats.RepoStats.to_dict()), an overview page follows the cover.
+    """
+    return render_pdf(build_document(projects, user_name, stats=stats), output_path)
+
+_fit_cache = {}
+_fit_cache_lock = threading.Lock()
+FIT_CACHE_SIZE = 8192
+
+class PortfolioPDF(FPDF):
+    """Portfolio PDF laid out from a compiled theme (see theme.py).
+    use_style only switches font and text colour when they actually change, and
+    fitted single-line text (headers, footers, cover lines, titles) is cached per
+    font across documents, so it is measured once per process.
+    """
+
+    def __init__(self, theme=None, ascii_only=False, texts=None):
+        super().__init__()
+        self.theme = theme or load_theme()
+        self.base_family = 'Arial'
+        self.unicode_font = False
+        self.font_signature = ('core',)
+        family = None if ascii_only else add_unicode_fonts(self, texts)
+        if family:
+            self.base_family = family
+            self.unicode_font = True
+            self.font_signature = tuple(sorted(font.ttffile for font in self.fonts.values()))
+        # TextStyle -> fpdf's (family, style, size) once that style has been selected
+        self._resolved_fonts = {}
+        self._device_colors = {}
+        self.set_auto_page_break(auto=True, margin=20)
+
+    def use_style(self, style):
+        """Select a TextStyle's font and colour, skipping whatever is already in effect"""
+        resolved = self._resolved_fonts.get(style.name)
+        if resolved is None or resolved != (self.font_family, self.font_style, self.font_size_pt):
+            self.set_font(self.base_family, style.font_style, style.size)
+            self._resolved_fonts[style.name] = (self.font_family, self.font_style, self.font_size_pt)
+        self._use_color('text_color', self.set_text_color, style.color)
+
+    def use_fill(self, rgb):
+        self._use_color('fill_color', self.set_fill_color, rgb)
+
+    def _use_color(self, attribute, setter, rgb):
+        device = self._device_colors.get((attribute, rgb))
+        if device is None or getattr(self, attribute) != device:
+            setter(*rgb)
+            self._device_colors[(attribute, rgb)] = getattr(self, attribute)
+
+    def _measure(self, key, compute):
+        key = (self.font_signature, self.font_family, self.font_style, self.font_size_pt) + key
+        with _fit_cache_lock:
+            value = _fit_cache.get(key)
+        if value is None:
+            value = compute()
+            with _fit_cache_lock:
+                if len(_fit_cache) >= FIT_CACHE_SIZE:
+                    _fit_cache.clear()
+                _fit_cache[key] = value
+        return value
+
+    def fit_text(self, text, width=0):
+        """`text` prepared for the current font and truncated with '...' to fit `width` (0: to the right margin)"""
+        if width == 0:
+            width = self.w - self.r_margin - self.x
+        return self._measure((round(width, 3), text), lambda: truncate_text_to_fit(self, text, width))
+
+    def min_char_width(self):
+        return self._measure((None,), lambda: self.get_string_width('W') + 0.5)
+
+    def header(self):
+        style = self.theme.styles['header']
+        self.styled_cell(style, self.theme.header_text)
+        self.ln(style.space_after)
+
+    def footer(self):
+        style = self.theme.styles['footer']
+        self.set_y(-15)
+        self.styled_cell(style, f'Page {self.page_no()}', ln=0)
+
+    def styled_cell(self, style, text, width=0, ln=1, align=None):
+        """One line of text in a TextStyle, truncated to fit"""
+        self.use_style(style)
+        self.safe_cell(width, style.height, text, 0, ln, align or style.align)
+
+    def styled_multi_cell(self, style, text):
+        """A wrapped paragraph in a TextStyle"""
+        self.use_style(style)
+        if style.indent:
+            self.cell(style.indent, style.height, '', 0, 0)
+        self.safe_multi_cell(0, style.height, text)
+
+    def rule(self):
+        """Full-width coloured rule under a title"""
+        rule = self.theme.rule
+        self.use_fill(rule['color'])
+        self.rect(self.l_margin, self.get_y(), self.w - self.l_margin - self.r_margin, rule['height'], 'F')
+        self.ln(rule['space_after'])
+
+    def safe_cell(self, w, h, txt='', border=0, ln=0, align='', fill=False):
+        try:
+            # Ensure there is enough horizontal space; if not, move to next line first
+            avail_width = (self.w - self.r_margin - self.x) if w == 0 else w
+            if avail_width <= self.min_char_width():
+                self.ln(h or 6)
+            safe_txt = self.fit_text(str(txt), w)
+            try:
+                self.cell(w, h, safe_txt, border, ln, align, fill)
+            except Exception as e:
+                if 'Not enough horizontal space' in str(e):
+                    # Try on a new line
+                    self.ln(h or 6)
+                    self.cell(w, h, safe_txt, border, ln, align, fill)
                 else:
-                    pdf.set_font('Arial', '', 11)
-                    pdf.set_text_color(0, 0, 0)
-                    lines = section.strip().split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith('*'):
-                            pdf.set_font('Arial', '', 10)
-                            pdf.set_text_color(52, 73, 94)
-                            pdf.cell(5, 6, '', 0, 0)
-                            pdf.safe_multi_cell(0, 6, line)
-                        elif line:
-                            pdf.set_font('Arial', '', 11)
-                            pdf.set_text_color(0, 0, 0)
-                            pdf.safe_multi_cell(0, 6, line)
-                            pdf.ln(2)
-            pdf.ln(5)
-        pdf.output("GitHub_Portfolio.pdf")
-        print("✨ Beautiful PDF portfolio generated successfully: GitHub_Portfolio.pdf")
+                    raise
+        except Exception as e:
+            self.cell(w, h, '[Text encoding error]', border, ln, align, fill)
+
+    def safe_multi_cell(self, w, h, txt, border=0, align='J', fill=False):
+        try:
+            cleaned_txt = prepare_pdf_text(self, txt)
+            # Ensure enough horizontal space for at least one char; if not, new line first
+            avail_width = (self.w - self.r_margin - self.x) if w == 0 else w
+            if avail_width <= self.min_char_width():
+                self.ln(h or 6)
+            try:
+                self.multi_cell(w, h, cleaned_txt, border, align, fill)
+            except Exception as e:
+                if 'Not enough horizontal space' in str(e):
+                    # Force new line and retry once
+                    self.ln(h or 6)
+                    self.multi_cell(w, h, cleaned_txt, border, align, fill)
+                else:
+                    raise
+        except Exception as e:
+            self.multi_cell(w, h, '[Text encoding error]', border, align, fill)
+
+def render_cover_page(pdf, document):
+    styles = pdf.theme.styles
+    lines = [('cover_title', document['title']), ('cover_subtitle', document['subtitle'])]
+    if document['user_name']:
+        lines.append(('cover_prepared', f"Prepared for: {document['user_name']}"))
+    lines.append(('cover_date', f"Generated on {document['generated_on']}"))
+    lines.append(('cover_count', f"Featuring {len(document['projects'])} Projects"))
+    pdf.add_page()
+    for name, text in lines:
+        style = styles[name]
+        if style.space_before:
+            pdf.ln(style.space_before)
+        pdf.styled_cell(style, text)
+        if style.space_after:
+            pdf.ln(style.space_after)
+
+def render_overview_page(pdf, stats):
+    """Add the statistics overview page: headline figures, language bars and top lists"""
+    styles = pdf.theme.styles
+    bar = pdf.theme.bar
+    pdf.add_page()
+    pdf.styled_cell(styles['page_title'], OVERVIEW_TITLE)
+    pdf.rule()
+    label_style, value_style = styles['figure_label'], styles['figure_value']
+    for label, value in overview_figures(stats):
+        pdf.styled_cell(label_style, f"{label}:", width=label_style.width, ln=0)
+        pdf.styled_cell(value_style, value)
+
+    def heading(text):
+        style = styles['overview_heading']
+        pdf.ln(style.space_before)
+        pdf.styled_cell(style, text)
+        pdf.ln(style.space_after)
+
+    def bars(rows):
+        # rows: (label, share of the total, value text)
+        style = styles['bar_label']
+        for label, share, value in rows:
+            pdf.styled_cell(style, label, width=style.width, ln=0)
+            pdf.use_fill(bar['color'])
+            pdf.rect(pdf.get_x(), pdf.get_y() + (style.height - bar['height']) / 2,
+                     max(share * bar['scale'], 0.5), bar['height'], 'F')
+            pdf.set_x(pdf.get_x() + bar['width'])
+            pdf.styled_cell(style, value)
+
+    def bullets(lines):
+        style = styles['list_item']
+        for line in lines:
+            pdf.cell(style.indent, style.height, '', 0, 0)
+            pdf.styled_cell(style, f"{pdf.theme.bullet_prefix}{line}")
+
+    if stats['languages']:
+        heading('Languages')
+        bars([(lang['name'], lang['share'], f"{lang['repos']} repos ({lang['share']:.0%})") for lang in stats['languages']])
+    if stats['language_bytes']:
+        heading('Code by Language')
+        bars([(lang['name'], lang['share'], f"{format_bytes(lang['bytes'])} ({lang['share']:.0%})") for lang in stats['language_bytes']])
+    if stats['most_starred']:
+        heading('Most Starred')
+        bullets(f"{repo['name']} - {repo['stars']:,} stars" for repo in stats['most_starred'])
+    if stats['recently_updated']:
+        heading('Recently Updated')
+        bullets(f"{repo['name']} - {repo['updated']}" for repo in stats['recently_updated'])
+
+def render_project_page(pdf, project):
+    theme = pdf.theme
+    styles = theme.styles
+    pdf.add_page()
+    pdf.styled_cell(styles['project_number'], f"Project {project['number']}")
+    pdf.styled_cell(styles['project_title'], project['title'])
+    pdf.rule()
+    for section in project['sections']:
+        if section['heading']:
+            style = styles['section_heading']
+            pdf.ln(style.space_before)
+            pdf.styled_cell(style, section['heading'])
+            pdf.ln(style.space_after)
+        for block in section['blocks']:
+            if block['type'] == 'bullet':
+                pdf.styled_multi_cell(styles['bullet'], f"{theme.bullet_prefix}{block['text']}")
+            else:
+                style = styles['paragraph']
+                pdf.styled_multi_cell(style, block['text'])
+                pdf.ln(style.space_after)
+    pdf.ln(theme.project_space_after)
+
+def render_pdf(document, output_path="GitHub_Portfolio.pdf", ascii_only=None, theme=None):
+    """Render a parsed portfolio document (see document.build_document) to PDF.
+    Text is embedded with a subset Unicode TTF unless ascii_only (or PORTFOLIO_ASCII_PDF) is set.
+    `theme` is a theme name or path (default: PORTFOLIO_THEME or themes/default.json).
+    """
+    if ascii_only is None:
+        ascii_only = ascii_pdf_requested()
+    try:
+        # Only non-ASCII text can need fallback fonts or lose glyphs
+        texts = [text for text in document_text(document) if not text.isascii()]
+        pdf = PortfolioPDF(load_theme(theme), ascii_only=ascii_only, texts=texts)
+        render_cover_page(pdf, document)
+        if document.get('stats'):
+            render_overview_page(pdf, document['stats'])
+        for project in document['projects']:
+            render_project_page(pdf, project)
+        with metrics.span('pdf.write'):
+            pdf.output(output_path)
+        metrics.incr('bytes_written', os.path.getsize(output_path))
+        print(f"✨ Beautiful PDF portfolio generated successfully: {output_path}")
+        missing = missing_glyphs(texts, pdf.glyph_coverage) if pdf.unicode_font else []
+        if missing:
+            metrics.incr('pdf_missing_glyphs', len(missing))
+            print(f"⚠️ {describe_missing_glyphs(missing)}")
+        return True
     except Exception as e:
-        print(f"Error generating PDF: {str(e)}")
\ No newline at end of file
+        print(f"Error generating PDF: {str(e)}")
+        return False
@@ -6,9 +6,18 @@ A script to generate a PDF portfolio from your GitHub repositories
 
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from main import get_user_repos, fetch_readme
-from process import generate_pdf, clean_text_for_pdf
+from main import get_user_repos, fetch_readme, prefetch_readmes, RepoInfo
+from process import clean_text_for_pdf, add_unicode_fonts, ascii_pdf_requested, describe_llm_usage, unsupported_characters, describe_missing_glyphs
+from theme import load_theme
+from outputs import write_outputs, parse_formats, DEFAULT_BASENAME
+from checkpoint import CheckpointJournal, DEFAULT_CHECKPOINT_PATH
+from metrics import metrics, peak_rss_mb
+from concurrency import AdaptiveLimiter, DEFAULT_MAX_CONCURRENCY, positive_int
+from stats import RepoStats, LanguageCache, fetch_language_bytes, LANGUAGE_CACHE_PATH
+from dedup import add_dedup_arguments, group_readmes, describe_groups, collapse_summary
+from filters import add_filter_arguments, load_filter_config, build_filters, describe_filters, listing_query_params, filter_repos
 from fpdf import FPDF
 import re
 
@@ -47,9 +56,28 @@ def get_readme_preview(readme_content, max_lines=10):
     
     return preview
 
-def should_include_repository(repo, readme_content):
+def apply_review_rules(repo, rules):
+    """
+    Apply batch review actions chosen earlier in the session.
+    Returns True/False when a rule decides the repository, None to ask the user.
+    """
+    if not rules:
+        return None
+    if rules.get('skip_forks') and repo.get('fork', False):
+        return False
+    if rules.get('include_all'):
+        return True
+    if repo.get('language') and repo.get('language') in rules.get('languages', set()):
+        return True
+    min_stars = rules.get('min_stars')
+    if min_stars is not None and (repo.get('stargazers_count') or 0) >= min_stars:
+        return True
+    return None
+
+def should_include_repository(repo, readme_content, rules=None):
     """
     Ask user whether to include this repository in the portfolio.
+    Batch actions update `rules` so later repositories can be decided without prompting.
     Returns True if should include, False otherwise.
     """
     if not readme_content or readme_content in ["No README found", ""] or readme_content.startswith("Error fetching README"):
@@ -61,12 +89,14 @@ def should_include_repository(repo, readme_content):
     repo_lang = repo.get('language', 'Unknown')
     repo_stars = repo.get('stargazers_count', 0)
     repo_private = repo.get('private', False)
+    repo_fork = repo.get('fork', False)
     
     print(f"\n📁 Repository: {repo_name}")
     print(f"   📝 Description: {repo_desc}")
     print(f"   💻 Language: {repo_lang}")
     print(f"   ⭐ Stars: {repo_stars}")
     print(f"   🔒 Private: {repo_private}")
+    print(f"   🍴 Fork: {repo_fork}")
     print()
     
     # Show README preview
@@ -75,9 +105,12 @@ def should_include_repository(repo, readme_content):
     print(preview)
     print()
     
+    if rules is None:
+        rules = {}
+    
     # Ask for user decision
     while True:
-        response = input(f"Include '{repo_name}' in portfolio? (y/n/s=show more/q=quit): ").strip().lower()
+        response = input(f"Include '{repo_name}' in portfolio? (y/n/s=show more/a=all/l=all {repo_lang}/f=skip forks/*N=stars>=N/q=quit): ").strip().lower()
         
         if response in ['y', 'yes']:
             return True
@@ -90,11 +123,37 @@ def should_include_repository(repo, readme_content):
             print(readme_content)
             print("=" * 80)
             print()
+        elif response in ['a', 'all']:
+            rules['include_all'] = True
+            print("   📦 Including this and all remaining repositories")
+            return True
+        elif response in ['l', 'lang', 'language']:
+            if not repo.get('language'):
+                print("   ⚠️ This repository has no detected language")
+                continue
+            rules.setdefault('languages', set()).add(repo['language'])
+            print(f"   📦 Including all {repo['language']} repositories from now on")
+            return True
+        elif response in ['f', 'forks', 'skip forks']:
+            rules['skip_forks'] = True
+            print("   📦 Skipping all forks from now on")
+            if repo_fork:
+                return False
+        elif response.startswith('*'):
+            try:
+                rules['min_stars'] = int(response[1:])
+            except ValueError:
+                print("Please enter a star count, e.g. '*10'")
+                continue
+            print(f"   📦 Including all repositories with at least {rules['min_stars']} stars from now on")
+            decision = apply_review_rules(repo, rules)
+            if decision is not None:
+                return decision
         elif response in ['q', 'quit']:
             print("Exiting portfolio generation...")
             exit(0)
         else:
-            print("Please enter 'y' (yes), 'n' (no), 's' (show more), or 'q' (quit)")
+            print("Please enter 'y' (yes), 'n' (no), 's' (show more), 'a' (all), 'l' (language), 'f' (skip forks), '*N' (min stars), or 'q' (quit)")
 
 def test_pdf_creation():
     """Test PDF creation capabilities before making expensive LLM calls"""
@@ -170,6 +229,15 @@ Regular paragraph text that spans multiple lines and tests the multi_cell functi
                 raise
         # --- END NEW TESTS ---
         
+        # Test the embedded Unicode font used for non-ASCII names and summaries
+        if not ascii_pdf_requested():
+            family = add_unicode_fonts(pdf)
+            if family:
+                pdf.set_font(family, '', 12)
+                pdf.multi_cell(0, 6, "Unicode test: café, naïve, Zoë, Ελληνικά, Кириллица – “quoted” • ✓")
+            else:
+                print("⚠️  Unicode font files not found; non-ASCII text will be simplified to ASCII")
+        
         # Try to save the PDF
         pdf.output(test_filename)
         
@@ -208,7 +276,57 @@ def main():
     parser.add_argument("--no-llm", action="store_true", help="Generate summaries heuristically without calling the LLM")
     parser.add_argument("--name", type=str, default=None, help="Name to display on the portfolio cover (non-interactive)")
     parser.add_argument("--auto-include-all", action="store_true", help="Automatically include all repositories with READMEs (skip manual selection)")
+    parser.add_argument("--resume", action="store_true", help="Resume an interrupted run from its checkpoint journal")
+    parser.add_argument("--fresh", action="store_true", help="Discard an existing checkpoint journal and start over")
+    parser.add_argument("--prefetch", type=int, default=8, help="Number of READMEs to fetch ahead in the background (default: 8, 0 disables)")
+    parser.add_argument("--checkpoint", type=str, default=DEFAULT_CHECKPOINT_PATH, help=f"Checkpoint journal path (default: {DEFAULT_CHECKPOINT_PATH})")
+    parser.add_argument("--formats", type=str, default="pdf", help="Comma-separated output formats: pdf, html, md, json or all (default: pdf)")
+    parser.add_argument("--output", type=str, default=DEFAULT_BASENAME, help=f"Output path without extension (default: {DEFAULT_BASENAME})")
+    parser.add_argument("--llm-concurrency", type=positive_int, default=DEFAULT_MAX_CONCURRENCY, help=f"Upper bound for parallel LLM requests; the actual number adapts to rate limits (default: {DEFAULT_MAX_CONCURRENCY})")
+    parser.add_argument("--no-overview", action="store_true", help="Leave out the statistics overview page")
+    parser.add_argument("--language-stats", action="store_true", help=f"Fetch per-language byte counts for the overview page (one API request per repository, cached in {LANGUAGE_CACHE_PATH})")
+    parser.add_argument("--ascii-pdf", action="store_true", help="Use the built-in ASCII-only PDF fonts instead of embedding the Unicode font")
+    parser.add_argument("--theme", type=str, default=None, help="PDF theme name in themes/ or path to a theme JSON file (default: PORTFOLIO_THEME or default)")
+    parser.add_argument("--metrics-json", type=str, default=None, help="Write per-stage timings and counters to this JSON file")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing profile (p50/p95) when the run ends")
+    add_filter_arguments(parser)
+    add_dedup_arguments(parser)
     args = parser.parse_args()
+    
+    try:
+        filters = build_filters(args, load_filter_config(args.filters) if args.filters else None)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Invalid repository filters: {e}")
+        return
+    try:
+        args.formats = parse_formats(args.formats)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return
+    
+    if args.ascii_pdf:
+        os.environ['PORTFOLIO_ASCII_PDF'] = '1'
+    if args.theme:
+        os.environ['PORTFOLIO_THEME'] = args.theme
+    if 'pdf' in args.formats:
+        try:
+            load_theme()
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: Invalid PDF theme: {e}")
+            return
+    
+    metrics.reset()
+    try:
+        generate_portfolio(args, filters)
+    finally:
+        if args.profile:
+            metrics.print_profile()
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+            print(f"📈 Metrics written to {args.metrics_json}")
+
+def generate_portfolio(args, filters):
+    """Run the portfolio pipeline for the parsed command-line arguments"""
 
     # Check for required environment variables
     no_llm = args.no_llm or str(os.getenv("PORTFOLIO_NO_LLM", "")).lower() in ("1", "true", "yes")
@@ -228,19 +346,48 @@ def main():
         print("This check prevents wasting money on LLM calls when PDF generation will fail.")
         return
     
+    if args.resume and not os.path.exists(args.checkpoint):
+        print(f"⚠️ No checkpoint found at {args.checkpoint}. Starting a fresh run.")
+    elif not args.resume and not args.fresh and os.path.exists(args.checkpoint) and os.path.getsize(args.checkpoint):
+        print(f"❌ {args.checkpoint} holds progress from an interrupted run.")
+        print("   Re-run with --resume to continue it, or with --fresh to discard it and start over.")
+        return
+    journal = CheckpointJournal(args.checkpoint, resume=args.resume)
+    if args.resume and journal.completed_entries:
+        print(f"♻️ Resuming from {args.checkpoint}: {journal.completed_entries} completed stages recorded")
+    
     # Get user's name (CLI arg preferred to avoid interactive prompt in automation)
-    user_name = args.name
+    user_name = args.name or journal.meta.get('user_name')
     if not user_name:
         user_name = input("Enter your name (as you want it to appear on the portfolio): ").strip()
         if not user_name:
             print("❌ Name cannot be empty. Exiting.")
+            journal.close()
             return
+    journal.record_meta(user_name=user_name)
+    if 'pdf' in args.formats:
+        missing = unsupported_characters([user_name])
+        if missing:
+            print(f"⚠️ {describe_missing_glyphs(missing)}")
     
     try:
         print("\n🚀 Starting GitHub portfolio generation...")
-        print("Fetching all your GitHub repositories...")
-        repos = get_user_repos()
-        print(f"Found {len(repos)} repositories")
+        if journal.repos is not None:
+            repos = [RepoInfo.from_api(repo) for repo in journal.repos]
+            print(f"Loaded {len(repos)} repositories from checkpoint")
+        else:
+            print("Fetching all your GitHub repositories...")
+            repos = get_user_repos(listing_query_params(filters), compact=True)
+            journal.record_repos(repos)
+            print(f"Found {len(repos)} repositories")
+        
+        active_filters = describe_filters(filters)
+        if active_filters:
+            listed = len(repos)
+            repos, filter_reasons = filter_repos(repos, filters)
+            print(f"🔎 Filters ({'; '.join(active_filters)}): kept {len(repos)} of {listed} repositories")
+            if filter_reasons:
+                print("   Filtered out: " + ", ".join(f"{count} {reason}" for reason, count in filter_reasons.most_common()))
         
         # Filter repositories with READMEs and manual selection
         repos_with_readme = []
@@ -254,30 +401,53 @@ def main():
         
         print()
         
-        for i, repo in enumerate(repos, 1):
+        def load_readme(repo):
+            if journal.has('readme', repo):
+                metrics.incr('cache_hits')
+                return journal.get('readme', repo)
+            # Use the actual repo owner to support org repos and fine-grained tokens
+            return fetch_readme(repo['name'], username=repo.get('owner', {}).get('login'))
+        
+        review_rules = {}
+        readmes = prefetch_readmes(repos, load_readme, lookahead=args.prefetch)
+        for i, (repo, readme) in enumerate(readmes, 1):
             repo_name = repo['name']
             print(f"📁 Checking {i}/{len(repos)}: {repo_name}", end="")
             
-            # Use the actual repo owner to support org repos and fine-grained tokens
-            readme = fetch_readme(repo_name, username=repo.get('owner', {}).get('login'))
+            if not journal.has('readme', repo) and not readme.startswith("Error fetching README"):
+                journal.record('readme', repo, readme)
             
             if readme != "No README found" and not readme.startswith("Error fetching README"):
                 print(" ✅ Has README")
                 
-                if args.auto_include_all:
+                rule_decision = apply_review_rules(repo, review_rules)
+                if journal.has('decision', repo):
+                    should_include = journal.get('decision', repo)
+                    print(f"   ♻️ {'Included' if should_include else 'Skipped'} (from checkpoint)")
+                elif args.auto_include_all:
                     # Automatically include all repos with READMEs
-                    repos_with_readme.append((repo, readme))
+                    should_include = True
+                    journal.record('decision', repo, True)
                     print(f"   🤖 Auto-included")
+                elif rule_decision is not None:
+                    should_include = rule_decision
+                    journal.record('decision', repo, should_include)
+                    print(f"   📦 {'Included' if should_include else 'Skipped'} by batch action")
                 else:
                     # Ask user for manual selection
-                    should_include = should_include_repository(repo, readme)
+                    should_include = should_include_repository(repo, readme, review_rules)
+                    journal.record('decision', repo, should_include)
                     
                     if should_include:
-                        repos_with_readme.append((repo, readme))
                         print(f"   ✅ Included by user")
                     else:
-                        skipped_repos.append(repo_name)
                         print(f"   ❌ Skipped by user")
+                
+                if should_include:
+                    # The README itself stays in the journal on disk until it is summarised
+                    repos_with_readme.append(repo)
+                else:
+                    skipped_repos.append(repo_name)
             else:
                 print(f" ❌ No README - {readme}")
                 skipped_repos.append(repo_name)
@@ -288,54 +458,140 @@ def main():
                 print(f"Skipped repositories: {', '.join(skipped_repos[:5])}")
                 if len(skipped_repos) > 5:
                     print(f"... and {len(skipped_repos) - 5} more")
+            journal.discard()
             return
         
         print(f"\n💰 Selected {len(repos_with_readme)} repositories for processing.")
         if skipped_repos:
             print(f"🚫 Skipped {len(skipped_repos)} repositories")
         
+        groups = group_readmes((journal.get('readme', repo) for repo in repos_with_readme), mode=args.dedup)
+        if len(groups) < len(repos_with_readme):
+            print(f"🧬 Dedup ({args.dedup}, {args.dedup_action}): {describe_groups(groups)}")
+            for group in groups:
+                if len(group) > 1:
+                    names = [repos_with_readme[i]['name'] for i in group]
+                    print(f"   {names[0]} ≈ {', '.join(names[1:])}")
+        
+        def journaled_summary(group):
+            for i in group:
+                if journal.has('summary', repos_with_readme[i]):
+                    return journal.get('summary', repos_with_readme[i])
+            return None
+        
+        pending_calls = sum(1 for group in groups if journaled_summary(group) is None)
+        recovered = len(groups) - pending_calls
+        if recovered:
+            print(f"♻️ {recovered} summaries recovered from checkpoint")
+        
         if no_llm:
             print("Running in NO-LLM mode (heuristic summaries). No API cost.")
         else:
-            print(f"This will make {len(repos_with_readme)} LLM calls.")
+            print(f"This will make {pending_calls} LLM calls.")
         
         # Ask for confirmation before making expensive LLM calls
-        if not no_llm:
-            response = input(f"Continue with {len(repos_with_readme)} LLM calls? (y/N): ").strip().lower()
+        if not no_llm and pending_calls:
+            response = input(f"Continue with {pending_calls} LLM calls? (y/N): ").strip().lower()
             if response not in ['y', 'yes']:
                 print("❌ Operation cancelled by user.")
+                print(f"💾 Progress saved to {args.checkpoint}. Re-run with --resume to continue.")
+                journal.close()
                 return
 
         # Now process with LLM (expensive operations)
-        print(f"\n🤖 Processing {len(repos_with_readme)} repositories{' without LLM' if no_llm else ' with LLM'}...")
-        projects = []
+        print(f"\n🤖 Processing {len(groups)} repositories{' without LLM' if no_llm else ' with LLM'}...")
+        # Import here to avoid loading the LLM client if not needed
+        from process import summarize_project_sections
         
-        for i, (repo, readme) in enumerate(repos_with_readme, 1):
-            repo_name = repo['name']
-            print(f"Processing {i}/{len(repos_with_readme)}: {repo_name}")
-            
-            # Import here to avoid loading the LLM client if not needed
-            from process import summarize_project
-            
-            print(f"  🤖 Generating AI summary...")
-            summary = summarize_project(readme)
-            
-            if not summary.startswith("Error generating summary"):
-                projects.append({
-                    'title': repo_name,
-                    'summary': summary
-                })
-                print(f"  ✅ Summary generated successfully")
+        def record_group(group, summary):
+            for member in group:
+                if not journal.has('summary', repos_with_readme[member]):
+                    journal.record('summary', repos_with_readme[member], summary)
+        
+        def group_label(group):
+            others = f" (+{len(group) - 1} duplicate{'s' if len(group) > 2 else ''})" if len(group) > 1 else ""
+            return f"{repos_with_readme[group[0]]['name']}{others}"
+        
+        to_summarise = []
+        for group in groups:
+            summary = journaled_summary(group)
+            if summary is None:
+                to_summarise.append(group)
             else:
-                print(f"  ❌ Failed: {summary}")
+                metrics.incr('cache_hits')
+                record_group(group, summary)
+                print(f"  ♻️ {group_label(group)}: summary loaded from checkpoint")
         
-        print(f"\n📊 Successfully processed {len(projects)} out of {len(repos_with_readme)} repositories")
+        # The limiter adapts the number of concurrent LLM calls; heuristic summaries run one at a time
+        limiter = None if no_llm else AdaptiveLimiter(maximum=args.llm_concurrency)
+        def summarise(group):
+            readme = journal.get('readme', repos_with_readme[group[0]])
+            return summarize_project_sections(readme, no_llm=no_llm, limiter=limiter)
+        
+        executor = ThreadPoolExecutor(max_workers=1 if no_llm else args.llm_concurrency)
+        try:
+            futures = {executor.submit(summarise, group): group for group in to_summarise}
+            for i, future in enumerate(as_completed(futures), 1):
+                group = futures[future]
+                summary, sections = future.result()
+                state = f"  [{limiter.describe()}]" if limiter else ""
+                if sections is None:
+                    print(f"  ❌ {i}/{len(to_summarise)} {group_label(group)}: {summary}{state}")
+                    continue
+                record_group(group, summary)
+                if not no_llm:
+                    # Only groups summarised in this run save calls; restored ones were counted before
+                    metrics.incr('llm_calls_avoided', len(group) - 1)
+                print(f"  ✅ {i}/{len(to_summarise)} {group_label(group)}{state}")
+        finally:
+            # On Ctrl-C, drop the queued requests instead of waiting for them
+            executor.shutdown(wait=False, cancel_futures=True)
+        if limiter and limiter.successes:
+            stats = limiter.stats()
+            print(f"🎛️ Adaptive concurrency: limit peaked at {stats['peak_limit']}, ended at {stats['limit']}; "
+                  f"{stats['overloads']} rate-limit/overload responses retried")
+        
+        projects = []
+        if args.dedup_action == 'collapse':
+            for group in groups:
+                repo = repos_with_readme[group[0]]
+                if journal.has('summary', repo):
+                    related = [repos_with_readme[i]['name'] for i in group[1:]]
+                    projects.append({
+                        'title': repo['name'],
+                        'summary': collapse_summary(journal.get('summary', repo), related)
+                    })
+            expected = len(groups)
+        else:
+            for repo in repos_with_readme:
+                if journal.has('summary', repo):
+                    projects.append({'title': repo['name'], 'summary': journal.get('summary', repo)})
+            expected = len(repos_with_readme)
+        
+        stats = None
+        if not args.no_overview:
+            # One pass over the metadata already in memory; no extra API calls unless --language-stats
+            portfolio_repos = [repo for repo in repos_with_readme if journal.has('summary', repo)]
+            repo_stats = RepoStats().update(portfolio_repos)
+            if args.language_stats and portfolio_repos:
+                cache = LanguageCache()
+                fetched = fetch_language_bytes(repo_stats, portfolio_repos, concurrency=max(args.prefetch, 1), cache=cache)
+                print(f"📦 Language breakdown: {fetched} fetched, {cache.hits} from cache")
+            stats = repo_stats.to_dict()
+        
+        avoided = metrics.counters.get('llm_calls_avoided', 0)
+        if avoided:
+            print(f"\n🧬 Deduplication avoided {avoided} LLM call{'s' if avoided != 1 else ''}")
+        llm_usage = describe_llm_usage(metrics.counters)
+        if llm_usage:
+            print(f"\n💸 LLM usage: {llm_usage}")
+        print(f"\n📊 Successfully processed {len(projects)} out of {expected} {'repository groups' if args.dedup_action == 'collapse' else 'repositories'}")
         
         if projects:
-            print(f"📄 Generating final PDF portfolio...")
-            generate_pdf(projects, user_name=user_name)
+            print(f"📄 Generating final portfolio ({', '.join(fmt.upper() for fmt in args.formats)})...")
+            written = write_outputs(projects, user_name=user_name, formats=args.formats, basename=args.output, stats=stats)
         else:
-            print("⚠️ No projects were successfully processed. Creating a placeholder portfolio PDF...")
+            print("⚠️ No projects were successfully processed. Creating a placeholder portfolio...")
             placeholder_projects = [{
                 'title': 'No Projects Processed',
                 'summary': (
@@ -349,10 +605,30 @@ def main():
                     'Confirms your setup works even when no repositories are processed.'
                 )
             }]
-            generate_pdf(placeholder_projects, user_name=user_name)
+            written = write_outputs(placeholder_projects, user_name=user_name, formats=args.formats, basename=args.output)
+        
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"🧠 Peak memory: {peak:.1f} MB")
+        
+        failed_formats = [fmt for fmt in args.formats if fmt not in written]
+        if len(projects) == expected and not failed_formats:
+            journal.discard()
+        else:
+            journal.close()
+            if failed_formats:
+                print(f"❌ Could not write: {', '.join(fmt.upper() for fmt in failed_formats)}")
+                print(f"💾 Summaries are kept in {args.checkpoint}. Re-run with --resume to write the portfolio without new LLM calls.")
+            else:
+                print(f"💾 Failed summaries can be retried with --resume (checkpoint: {args.checkpoint})")
             
+    except KeyboardInterrupt:
+        journal.close()
+        print(f"\n⏸️ Interrupted. Progress saved to {args.checkpoint}. Re-run with --resume to continue.")
     except Exception as e:
+        journal.close()
         print(f"❌ Error: {str(e)}")
+        print(f"💾 Progress saved to {args.checkpoint}. Re-run with --resume to continue.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
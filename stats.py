@@ -0,0 +1,194 @@
+"""
+Repository statistics in a single pass.
+
+RepoStats consumes repository metadata one repo at a time (RepoInfo objects or
+raw API dicts) and keeps only counters and bounded top-k heaps, so accounts
+with thousands of repositories are summarised without sorting or re-scanning
+the list:
+
+    stats = RepoStats().update(repos)
+    stats.most_starred()      # [(name, stars), ...]
+
+fetch_language_bytes optionally adds the per-language byte breakdown from
+/repos/{owner}/{repo}/languages, fetched concurrently and cached on disk until
+the repository is pushed to again.
+"""
+
+import os
+import json
+import heapq
+import threading
+from itertools import count
+from collections import Counter
+
+from main import fetch_repo_languages
+from concurrency import map_ahead
+
+DEFAULT_TOP = 5
+LANGUAGE_CACHE_PATH = '.portfolio_languages.json'
+
+
+def _push_top(heap, size, entry):
+    """Keep the `size` largest entries in a min-heap"""
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+class RepoStats:
+    """Counters, language tallies and top-k lists accumulated one repository at a time"""
+
+    def __init__(self, top=DEFAULT_TOP):
+        self.top = top
+        self.total = 0
+        self.public = 0
+        self.private = 0
+        self.forked = 0
+        self.archived = 0
+        self.stars = 0
+        self.forks = 0
+        self.languages = Counter()
+        self.language_bytes = Counter()
+        # Heap entries are (key, -sequence, name): among equal keys the earlier repo ranks higher
+        self._recent = []
+        self._starred = []
+        self._sequence = count()
+
+    def add(self, repo):
+        self.total += 1
+        if repo.get('private', False):
+            self.private += 1
+        else:
+            self.public += 1
+        if repo.get('fork', False):
+            self.forked += 1
+        if repo.get('archived', False):
+            self.archived += 1
+        stars = repo.get('stargazers_count', 0) or 0
+        self.stars += stars
+        self.forks += repo.get('forks_count', 0) or 0
+        language = repo.get('language')
+        if language and language != 'Unknown':
+            self.languages[language] += 1
+
+        order = -next(self._sequence)
+        name = repo['name']
+        _push_top(self._recent, self.top, (repo.get('updated_at') or '', order, name))
+        if stars > 0:
+            _push_top(self._starred, self.top, (stars, order, name))
+
+    def update(self, repos):
+        """Add every repository from an iterable; returns self"""
+        for repo in repos:
+            self.add(repo)
+        return self
+
+    def add_language_bytes(self, breakdown):
+        """Add one repository's /languages breakdown ({language: bytes})"""
+        self.language_bytes.update(breakdown or {})
+
+    def top_languages(self, n=None):
+        """[(language, repo count)], most used first"""
+        return self.languages.most_common(n)
+
+    def top_language_bytes(self, n=None):
+        """[(language, bytes)], largest first; empty unless byte breakdowns were added"""
+        return self.language_bytes.most_common(n)
+
+    def most_recent(self):
+        """[(name, updated date)] for the most recently updated repositories"""
+        return [(name, updated[:10]) for updated, _, name in sorted(self._recent, reverse=True)]
+
+    def most_starred(self):
+        """[(name, stars)] for the most starred repositories (repositories without stars are left out)"""
+        return [(name, stars) for stars, _, name in sorted(self._starred, reverse=True)]
+
+    def to_dict(self, languages=8):
+        """Plain-data summary for the portfolio document"""
+        total_bytes = sum(self.language_bytes.values())
+        return {
+            'total_repos': self.total,
+            'public_repos': self.public,
+            'private_repos': self.private,
+            'forked_repos': self.forked,
+            'archived_repos': self.archived,
+            'total_stars': self.stars,
+            'total_forks': self.forks,
+            'languages': [
+                {'name': name, 'repos': repos, 'share': round(repos / self.total, 4)}
+                for name, repos in self.top_languages(languages)
+            ],
+            'language_bytes': [
+                {'name': name, 'bytes': size, 'share': round(size / total_bytes, 4)}
+                for name, size in self.top_language_bytes(languages)
+            ],
+            'most_starred': [{'name': name, 'stars': stars} for name, stars in self.most_starred()],
+            'recently_updated': [{'name': name, 'updated': updated} for name, updated in self.most_recent()],
+        }
+
+
+class LanguageCache:
+    """On-disk cache of /languages breakdowns, valid until the repository's pushed_at changes"""
+
+    def __init__(self, path=LANGUAGE_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    @staticmethod
+    def _key(repo):
+        return repo.get('full_name') or f"{repo.get('owner', {}).get('login')}/{repo['name']}"
+
+    def get(self, repo):
+        with self._lock:
+            entry = self._entries.get(self._key(repo))
+            if entry is None or entry.get('pushed_at') != repo.get('pushed_at'):
+                return None
+            self.hits += 1
+            return entry['languages']
+
+    def put(self, repo, languages):
+        with self._lock:
+            self._entries[self._key(repo)] = {'pushed_at': repo.get('pushed_at'), 'languages': languages}
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+def fetch_language_bytes(stats, repos, token=None, session=None, concurrency=8, cache=None):
+    """Fetch /languages for each repository (up to `concurrency` at a time) into stats.language_bytes.
+    Cached breakdowns are reused; returns the number of API requests made.
+    """
+    def load(repo):
+        cached = cache.get(repo) if cache is not None else None
+        if cached is not None:
+            return cached, False
+        languages = fetch_repo_languages(repo['name'], repo.get('owner', {}).get('login'), token, session)
+        if languages is not None and cache is not None:
+            cache.put(repo, languages)
+        return languages, True
+
+    fetched = 0
+    for _, (languages, requested) in map_ahead(load, repos, concurrency):
+        fetched += requested
+        stats.add_language_bytes(languages)
+    if cache is not None:
+        cache.save()
+    return fetched
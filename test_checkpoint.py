@@ -0,0 +1,69 @@
+"""
+Checkpoint journal replay (no network)
+"""
+
+from checkpoint import CheckpointJournal
+
+REPO_A = {'name': 'alpha', 'full_name': 'me/alpha'}
+REPO_B = {'name': 'beta', 'full_name': 'me/beta'}
+
+
+def write_journal(path):
+    journal = CheckpointJournal(path)
+    journal.record_meta(user_name='José')
+    journal.record('readme', REPO_A, '# Alpha ✓\nA README')
+    journal.record('decision', REPO_A, True)
+    journal.record('summary', REPO_A, '**Project Overview:**\nAlpha.')
+    journal.close()
+
+
+def test_resume_replays_completed_stages(tmp_path):
+    path = str(tmp_path / 'ck.jsonl')
+    write_journal(path)
+    journal = CheckpointJournal(path, resume=True)
+    assert journal.meta == {'user_name': 'José'}
+    assert journal.get('readme', REPO_A) == '# Alpha ✓\nA README'
+    assert journal.get('decision', REPO_A) is True
+    assert journal.get('summary', REPO_A) == '**Project Overview:**\nAlpha.'
+    assert not journal.has('summary', REPO_B)
+    journal.close()
+
+
+def test_resume_drops_torn_last_line(tmp_path):
+    path = str(tmp_path / 'ck.jsonl')
+    write_journal(path)
+    with open(path, 'ab') as f:
+        # A crash mid-write: half an entry, cut inside a multi-byte character
+        f.write('{"stage": "summary", "repo": "me/beta", "value": "Bé'.encode('utf-8')[:-1])
+
+    journal = CheckpointJournal(path, resume=True)
+    assert journal.completed_entries == 3
+    assert not journal.has('summary', REPO_B)
+    journal.record('summary', REPO_B, 'Beta.')
+    journal.close()
+
+    journal = CheckpointJournal(path, resume=True)
+    assert journal.get('summary', REPO_B) == 'Beta.'
+    assert journal.get('summary', REPO_A) == '**Project Overview:**\nAlpha.'
+    journal.close()
+
+
+def test_resume_skips_corrupt_line(tmp_path):
+    path = str(tmp_path / 'ck.jsonl')
+    write_journal(path)
+    with open(path, 'ab') as f:
+        f.write(b'not json\n')
+        f.write(b'{"stage": "decision", "repo": "me/beta", "value": false}\n')
+
+    journal = CheckpointJournal(path, resume=True)
+    assert journal.get('decision', REPO_B) is False
+    assert journal.get('readme', REPO_A) == '# Alpha ✓\nA README'
+    journal.close()
+
+
+def test_discard_removes_journal(tmp_path):
+    path = tmp_path / 'ck.jsonl'
+    write_journal(str(path))
+    journal = CheckpointJournal(str(path), resume=True)
+    journal.discard()
+    assert not path.exists()
@@ -0,0 +1,164 @@
+"""
+AIMD limiter and map_ahead (no network)
+"""
+
+import time
+import argparse
+import threading
+
+import pytest
+
+from metrics import metrics
+from concurrency import AdaptiveLimiter, Overloaded, map_ahead, positive_int
+
+
+class RateLimited(Exception):
+    pass
+
+
+class Flaky(Exception):
+    pass
+
+
+def classify(exc):
+    if isinstance(exc, RateLimited):
+        return 'overload'
+    if isinstance(exc, Flaky):
+        return 'transient'
+    return None
+
+
+def test_backs_off_once_per_congestion_episode():
+    limiter = AdaptiveLimiter(initial=8, maximum=16)
+    metrics.reset()
+    # Eight requests in flight when the service starts rejecting them
+    starts = [limiter.acquire() for _ in range(8)]
+    for started in starts:
+        limiter.on_overload(started)
+        limiter.release()
+    assert limiter.limit == 5
+    assert limiter.overloads == 8
+    assert metrics.counters['llm_backoffs'] == 1
+
+    # A request sent after the cut that is rejected again is a new episode
+    started = limiter.acquire()
+    limiter.on_overload(started)
+    limiter.release()
+    assert limiter.limit == 3
+    assert metrics.counters['llm_backoffs'] == 2
+
+
+def test_never_backs_off_below_minimum():
+    limiter = AdaptiveLimiter(initial=2, minimum=1)
+    for _ in range(5):
+        started = limiter.acquire()
+        limiter.on_overload(started)
+        limiter.release()
+    assert limiter.limit == 1
+
+
+def test_slow_start_then_additive_increase():
+    limiter = AdaptiveLimiter(initial=2, maximum=6)
+    for _ in range(2):
+        limiter.on_success(time.monotonic(), 1.0)
+    assert limiter.limit == 4  # one more slot per success until the first overload
+
+    limiter.on_overload(limiter.acquire())
+    limiter.release()
+    assert limiter.limit == 2
+    limiter.on_success(time.monotonic(), 1.0)
+    assert limiter.limit == 2  # now one more slot per full window (= limit) of successes
+    limiter.on_success(time.monotonic(), 1.0)
+    assert limiter.limit == 3
+    for _ in range(20):
+        limiter.on_success(time.monotonic(), 1.0)
+    assert limiter.limit == 6  # capped at maximum
+
+
+def test_rising_latency_holds_the_limit():
+    limiter = AdaptiveLimiter(initial=2, maximum=10)
+    limiter.on_success(time.monotonic(), 1.0)
+    assert limiter.limit == 3
+    for _ in range(5):
+        limiter.on_success(time.monotonic(), 10.0)
+    assert limiter.limit == 3
+
+
+def test_call_retries_overloads_and_transient_errors():
+    limiter = AdaptiveLimiter(initial=4, base_delay=0)
+    outcomes = [RateLimited(), Flaky(), 'ok']
+
+    def func():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert limiter.call(func, classify) == 'ok'
+    assert limiter.retries == 2
+    assert limiter.overloads == 1
+    assert limiter.limit == 2  # only the 429 backed off
+    assert limiter.in_flight == 0
+
+
+def test_call_gives_up_and_reraises():
+    limiter = AdaptiveLimiter(base_delay=0, max_retries=2)
+
+    def rate_limited():
+        raise RateLimited()
+
+    with pytest.raises(Overloaded):
+        limiter.call(rate_limited, classify)
+    assert limiter.retries == 2
+
+    def broken():
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError):
+        limiter.call(broken, classify)
+    assert limiter.in_flight == 0
+
+
+def test_in_flight_never_exceeds_limit():
+    limiter = AdaptiveLimiter(initial=3, maximum=3)
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal peak
+        with lock:
+            peak = max(peak, limiter.in_flight)
+        time.sleep(0.01)
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 3
+    assert limiter.successes == 12
+
+
+def test_map_ahead_keeps_input_order():
+    items = [0.03, 0.0, 0.02, 0.01, 0.0]
+
+    def slow(delay):
+        time.sleep(delay)
+        return delay * 100
+
+    assert list(map_ahead(slow, items, lookahead=3)) == [(item, item * 100) for item in items]
+    assert list(map_ahead(slow, items, lookahead=0)) == [(item, item * 100) for item in items]
+
+
+def test_map_ahead_passes_none_items_through():
+    items = [1, None, 2, None, 3]
+    assert [item for item, _ in map_ahead(lambda item: item, items, lookahead=2)] == items
+
+
+def test_positive_int_rejects_zero():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--llm-concurrency', type=positive_int)
+    assert parser.parse_args(['--llm-concurrency', '3']).llm_concurrency == 3
+    for value in ('0', '-2', 'x'):
+        with pytest.raises(SystemExit):
+            parser.parse_args(['--llm-concurrency', value])
@@ -0,0 +1,65 @@
+"""
+README deduplication: exact digests and SimHash banding (no network)
+"""
+
+import random
+
+from dedup import group_readmes, simhash, hamming_distance, NEAR_DUPLICATE_DISTANCE
+
+WORDS = ('alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu nu xi omicron pi rho '
+         'sigma tau upsilon phi chi psi omega build test deploy cache queue render parse fetch').split()
+
+
+def make_readme(rng, words=120):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def edit(rng, text, changes):
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return ' '.join(words)
+
+
+def test_exact_ignores_line_endings_and_trailing_whitespace():
+    groups = group_readmes(['# Title\nBody', '# Title  \r\nBody\n', '# Other'], mode='exact')
+    assert groups == [[0, 1], [2]]
+
+
+def test_off_keeps_every_readme_apart():
+    assert group_readmes(['same', 'same'], mode='off') == [[0], [1]]
+
+
+def test_near_groups_small_edits():
+    rng = random.Random(1)
+    base = make_readme(rng, 400)
+    variant = edit(rng, base, 2)
+    other = make_readme(rng, 400)
+    assert hamming_distance(simhash(base), simhash(variant)) <= NEAR_DUPLICATE_DISTANCE
+    assert group_readmes([base, other, variant], mode='near') == [[0, 2], [1]]
+
+
+def test_near_leaves_short_readmes_to_exact_matching():
+    assert simhash('too short to fingerprint') is None
+    assert group_readmes(['too short', 'too short', 'also short'], mode='near') == [[0, 1], [2]]
+
+
+def test_banding_finds_every_representative_within_max_distance():
+    rng = random.Random(7)
+    bases = [make_readme(rng, 200) for _ in range(6)]
+    readmes = [edit(rng, rng.choice(bases), rng.randint(0, 12)) for _ in range(80)]
+    fingerprints = [simhash(readme) for readme in readmes]
+    for max_distance in (0, 3, NEAR_DUPLICATE_DISTANCE, 10):
+        groups = group_readmes(readmes, mode='near', max_distance=max_distance)
+        assert sorted(i for group in groups for i in group) == list(range(len(readmes)))
+        representatives = []
+        for group in groups:
+            first = group[0]
+            # Members are within max_distance of their representative...
+            for member in group[1:]:
+                assert hamming_distance(fingerprints[member], fingerprints[first]) <= max_distance
+            # ...and a new group only starts when no earlier representative was close enough
+            for other in representatives:
+                if other < first:
+                    assert hamming_distance(fingerprints[first], fingerprints[other]) > max_distance
+            representatives.append(first)
@@ -0,0 +1,64 @@
+"""
+Incremental README decoding (no network)
+"""
+
+import codecs
+
+from main import _decode_readme_stream
+
+
+class FakeResponse:
+    """Stands in for a streamed requests.Response"""
+
+    def __init__(self, body, chunk=7, content_type='text/plain'):
+        self.body = body
+        self.chunk = chunk
+        self.headers = {'Content-Type': content_type}
+
+    def iter_content(self, chunk_size=None):
+        for start in range(0, len(self.body), self.chunk):
+            yield self.body[start:start + self.chunk]
+
+
+def decode(body, **kwargs):
+    max_bytes = kwargs.pop('max_bytes', 1 << 20)
+    return _decode_readme_stream(FakeResponse(body, **kwargs), max_bytes)
+
+
+def test_utf8_sequence_split_across_chunks():
+    text = 'Café ☕ 日本語 — naïve 🚀 end'
+    body = text.encode('utf-8')
+    # Every chunk size splits some multi-byte sequence somewhere
+    for chunk in range(1, 9):
+        assert decode(body, chunk=chunk) == text
+
+
+def test_utf8_bom_is_stripped():
+    assert decode(codecs.BOM_UTF8 + 'Ünïcode'.encode('utf-8'), chunk=2) == 'Ünïcode'
+
+
+def test_cp1252_fallback_after_valid_utf8_prefix():
+    text = 'A plain ASCII opening line\nCafé “quoted” – €5'
+    body = text.encode('cp1252')
+    assert decode(body, chunk=5) == text
+
+
+def test_declared_charset_is_preferred_over_cp1252():
+    text = 'Привет, мир'
+    body = text.encode('koi8-r')
+    assert decode(body, content_type='text/plain; charset="koi8-r"') == text
+
+
+def test_utf16_by_bom():
+    text = 'Über 日本 README\n'
+    for bom, codec in ((codecs.BOM_UTF16_LE, 'utf-16-le'), (codecs.BOM_UTF16_BE, 'utf-16-be')):
+        body = bom + text.encode(codec)
+        for chunk in (1, 3, 4):
+            assert decode(body, chunk=chunk) == text
+
+
+def test_byte_cap_marks_truncation():
+    text = decode(b'x' * 5000, chunk=1024, max_bytes=2048)
+    assert text.startswith('x' * 2048)
+    assert 'x' * 2049 not in text
+    assert text.endswith('[README truncated at 2 KB]')
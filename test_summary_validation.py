@@ -0,0 +1,126 @@
+"""
+Streamed summary format checks (no network)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import process
+from metrics import metrics
+from document import parse_summary
+from process import SummaryValidator, SummaryFormatError, FORMAT_RETRIES
+
+GOOD = (
+    "**Project Overview:**\n"
+    "A command-line tool that turns GitHub repositories into a portfolio.\n\n"
+    "**Key Features:**\n"
+    "* **Fast:** renders a hundred projects in seconds\n"
+    "* **Portable:** PDF, HTML and Markdown output\n"
+    "* Works with **private** repositories too\n\n"
+    "**Technologies Used:**\n"
+    "Python, **fpdf2**, Anthropic API\n\n"
+    "**Impact & Benefits:**\n"
+    "Saves hours of manual writing."
+)
+
+DRIFTED = "Sure! Here is a summary of the repository you shared, written for a portfolio.\n\n" + GOOD
+
+
+def validate(text, chunk=7):
+    validator = SummaryValidator()
+    for start in range(0, len(text), chunk):
+        validator.feed(text[start:start + chunk])
+    return validator.finish()
+
+
+def test_bold_labelled_bullets_pass_validation():
+    for chunk in (1, 2, 7, len(GOOD)):
+        text, sections = validate(GOOD, chunk)
+        assert text == GOOD
+        assert [section['heading'] for section in sections] == list(process.SUMMARY_SECTIONS)
+    features = sections[1]['blocks']
+    assert features == [
+        {'type': 'bullet', 'text': 'Fast: renders a hundred projects in seconds'},
+        {'type': 'bullet', 'text': 'Portable: PDF, HTML and Markdown output'},
+        {'type': 'bullet', 'text': 'Works with private repositories too'},
+    ]
+    assert sections[2]['blocks'] == [{'type': 'paragraph', 'text': 'Python, fpdf2, Anthropic API'}]
+
+
+def test_headers_only_count_at_the_start_of_a_line():
+    sections = parse_summary("**Key Features:**\n- **Fast:** quick\n  **Technologies Used:** Python")
+    assert [section['heading'] for section in sections] == ['Key Features:', 'Technologies Used:']
+    assert sections[0]['blocks'] == [{'type': 'paragraph', 'text': '- Fast: quick'}]
+    assert sections[1]['blocks'] == [{'type': 'paragraph', 'text': 'Python'}]
+
+
+def test_preamble_is_rejected():
+    with pytest.raises(SummaryFormatError, match="before the first section header"):
+        validate(DRIFTED)
+
+
+def test_unexpected_header_is_rejected_mid_stream():
+    text = GOOD.replace("**Technologies Used:**", "**Fast:**")
+    with pytest.raises(SummaryFormatError, match="unexpected section header 'Fast:'"):
+        validate(text)
+    # Stopped as soon as the header closed, before the rest of the summary arrived
+    validator = SummaryValidator()
+    stop = text.rindex("**Fast:**") + len("**Fast:**")
+    validator.feed(text[:stop - 1])
+    with pytest.raises(SummaryFormatError):
+        validator.feed(text[stop - 1:stop])
+
+
+def test_missing_section_is_rejected():
+    with pytest.raises(SummaryFormatError, match="missing section"):
+        validate(GOOD.split("**Impact & Benefits:**")[0])
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        yield SimpleNamespace(type='message_start', message=SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=0)))
+        for start in range(0, len(self.text), 5):
+            yield SimpleNamespace(type='text', text=self.text[start:start + 5])
+
+
+class FakeClient:
+    def __init__(self, completions):
+        self.completions = list(completions)
+        self.requests = 0
+        self.messages = self
+
+    def stream(self, **kwargs):
+        self.requests += 1
+        return FakeStream(self.completions.pop(0))
+
+
+def test_retries_then_keeps_the_last_attempt(monkeypatch):
+    client = FakeClient([DRIFTED] * (FORMAT_RETRIES + 1))
+    monkeypatch.setattr(process, 'get_anthropic_client', lambda retry_in_sdk=True: client)
+    metrics.reset()
+    summary, sections = process.summarize_project_sections("# README", no_llm=False)
+    assert client.requests == FORMAT_RETRIES + 1
+    assert summary == DRIFTED
+    assert sections == parse_summary(DRIFTED)
+    assert sections[0]['heading'] is None
+    assert metrics.counters['llm_format_retries'] == FORMAT_RETRIES
+    assert metrics.counters['llm_format_fallbacks'] == 1
+
+
+def test_retry_that_validates_is_used(monkeypatch):
+    client = FakeClient([DRIFTED, GOOD])
+    monkeypatch.setattr(process, 'get_anthropic_client', lambda retry_in_sdk=True: client)
+    summary, sections = process.summarize_project_sections("# README", no_llm=False)
+    assert client.requests == 2
+    assert summary == GOOD
+    assert sections[0]['heading'] == 'Project Overview:'
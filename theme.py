@@ -0,0 +1,121 @@
+"""
+PDF themes.
+
+A theme is a JSON file (see themes/default.json) that names the colours, text
+styles and spacing of every element of the portfolio PDF. load_theme compiles
+it once per process into TextStyle objects, which the renderer applies with
+PortfolioPDF.use_style. Custom themes only need the keys they change; the rest
+comes from the default theme.
+
+    python run.py --theme themes/mytheme.json     # or PORTFOLIO_THEME=...
+"""
+
+import os
+import json
+import threading
+
+THEME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'themes')
+DEFAULT_THEME = 'default'
+STYLE_KEYS = {'style', 'size', 'color', 'height', 'align', 'space_before', 'space_after', 'indent', 'width'}
+
+
+class TextStyle:
+    """One compiled text style: font style and size, RGB colour, line height and spacing in mm"""
+    __slots__ = ('name', 'font_style', 'size', 'color', 'height', 'align', 'space_before', 'space_after',
+                 'indent', 'width')
+
+    def __init__(self, name, style='', size=11, color=(0, 0, 0), height=6, align='L',
+                 space_before=0, space_after=0, indent=0, width=0):
+        self.name = name
+        self.font_style = style
+        self.size = size
+        self.color = color
+        self.height = height
+        self.align = align
+        self.space_before = space_before
+        self.space_after = space_after
+        self.indent = indent
+        self.width = width
+
+    def __repr__(self):
+        return f"TextStyle({self.name!r}, {self.font_style!r}, {self.size}, {self.color})"
+
+
+class Theme:
+    """A compiled theme: TextStyle per element plus rule/bar settings"""
+
+    def __init__(self, name, styles, rule, bar, header_text, bullet_prefix, project_space_after):
+        self.name = name
+        self.styles = styles
+        self.rule = rule
+        self.bar = bar
+        self.header_text = header_text
+        self.bullet_prefix = bullet_prefix
+        self.project_space_after = project_space_after
+
+
+def theme_path(name=None):
+    """Resolve a theme name ('default') or JSON path; PORTFOLIO_THEME is the default"""
+    name = name or os.getenv('PORTFOLIO_THEME') or DEFAULT_THEME
+    if name.endswith('.json') or os.sep in name:
+        return name
+    return os.path.join(THEME_DIR, f"{name}.json")
+
+
+def _merge(base, override):
+    merged = dict(base)
+    for key, value in override.items():
+        merged[key] = _merge(base[key], value) if isinstance(value, dict) and isinstance(base.get(key), dict) else value
+    return merged
+
+
+def _color(value, colors, where):
+    if isinstance(value, str):
+        if value not in colors:
+            raise ValueError(f"Theme {where}: unknown colour '{value}'")
+        value = colors[value]
+    if len(value) != 3 or not all(isinstance(c, int) and 0 <= c <= 255 for c in value):
+        raise ValueError(f"Theme {where}: colour must be a name or [r, g, b] with 0-255 values")
+    return tuple(value)
+
+
+def compile_theme(data, name=None):
+    """Build a Theme from parsed theme JSON (already merged with the default theme)"""
+    colors = data.get('colors', {})
+    styles = {}
+    for key, spec in data['styles'].items():
+        spec = dict(spec)
+        unknown = set(spec) - STYLE_KEYS
+        if unknown:
+            raise ValueError(f"Theme style '{key}': unknown settings {', '.join(sorted(unknown))}")
+        spec['color'] = _color(spec.get('color', 'text'), colors, f"style '{key}'")
+        styles[key] = TextStyle(key, **spec)
+    rule = dict(data['rule'], color=_color(data['rule']['color'], colors, 'rule'))
+    bar = dict(data['bar'], color=_color(data['bar']['color'], colors, 'bar'))
+    return Theme(name or data.get('name', 'custom'), styles, rule, bar, data['header_text'],
+                 data['bullet_prefix'], data['project_space_after'])
+
+
+_themes = {}
+_themes_lock = threading.Lock()
+
+
+def load_theme(name=None):
+    """Compiled theme for a name or path, cached per process (reloaded if the file changes)"""
+    path = theme_path(name)
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    with _themes_lock:
+        theme = _themes.get(key)
+    if theme is not None:
+        return theme
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    default_path = theme_path(DEFAULT_THEME)
+    if os.path.abspath(path) != os.path.abspath(default_path):
+        with open(default_path, 'r', encoding='utf-8') as f:
+            data = _merge(json.load(f), data)
+    theme = compile_theme(data, os.path.splitext(os.path.basename(path))[0])
+    with _themes_lock:
+        _themes[key] = theme
+    return theme